@@ -1,6 +1,8 @@
 import streamlit as st
 import random
 
+from utils.warmup import readiness, start_warmup
+
 st.set_page_config(
     page_title="NEO Health AI",
     page_icon="⚕️",
@@ -8,6 +10,9 @@ st.set_page_config(
     initial_sidebar_state="collapsed"
 )
 
+# Load and prime the predictor models before a page needs them
+start_warmup()
+
 st.markdown("""
     <style>
         .st-emotion-cache-6qob1r, 
@@ -539,6 +544,36 @@ st.markdown(
     unsafe_allow_html=True
 )
 
+# Model readiness
+def _render_model_status(report):
+    ready = sum(status['ready'] for status in report['pipelines'].values())
+    total = len(report['pipelines'])
+    if report['ready']:
+        latency = max(status['latency_ms'] for status in report['pipelines'].values())
+        st.caption(f"🟢 {ready}/{total} prediction models ready, "
+                   f"{latency:.1f} ms per prediction or less")
+    elif report['warming']:
+        st.caption(f"🟡 Preparing prediction models ({ready}/{total} ready)")
+    else:
+        failed = [name for name, status in report['pipelines'].items() if status['error']]
+        st.caption(f"🔴 {ready}/{total} prediction models ready"
+                   + (f", failed to load: {', '.join(failed)}" if failed else ""))
+
+
+@st.fragment(run_every=2)
+def _watch_warmup():
+    report = readiness()
+    if not report['warming']:
+        st.rerun()
+    _render_model_status(report)
+
+
+model_report = readiness()
+if model_report['warming']:
+    _watch_warmup()
+else:
+    _render_model_status(model_report)
+
 # Footer Section
 st.markdown(
     """
@@ -0,0 +1,183 @@
+"""Score large CSV exports offline with the trained predictor pipelines.
+
+    python batch_score.py diabetes patients.csv predictions.csv
+    python batch_score.py bp vitals.csv predictions/ --format parquet --workers 8
+
+The input is streamed in fixed-size chunks, headers are matched with the same
+aliases the predictor pages use, chunks are scored in a process pool and the
+results are written in input order as each chunk completes. At most
+``2 * workers`` chunks are in memory at once. Progress is checkpointed after
+every chunk, so an interrupted run continues where it stopped with
+``--resume``. Resuming needs the same predictor, chunk size and unchanged
+input file; the completed chunks are re-read and skipped by record, so
+quoted fields with embedded newlines stay aligned.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+from utils.model_registry import ARTIFACTS, get_pipeline
+from utils.predictors import match_columns, missing_fields, read_csv, score_frame
+
+_worker = {}
+
+
+def _init_worker(name, matched):
+    # Each worker process loads (or maps) the pipeline once
+    _worker['name'] = name
+    _worker['matched'] = matched
+    _worker['pipeline'] = get_pipeline(name)
+
+
+def _score_chunk(index, chunk):
+    results = score_frame(_worker['name'], _worker['pipeline'], chunk, _worker['matched'])
+    return index, results
+
+
+def _progress_path(output):
+    return output.rstrip(os.sep) + '.progress.json'
+
+
+def _input_signature(path):
+    stat = os.stat(path)
+    return {'input': os.path.abspath(path), 'input_size': stat.st_size,
+            'input_mtime_ns': stat.st_mtime_ns}
+
+
+def _load_progress(output, args):
+    path = _progress_path(output)
+    if not (args.resume and os.path.exists(path)):
+        return {'chunks_done': 0, 'rows_done': 0, 'bytes_done': 0}
+    with open(path, encoding='utf-8') as fh:
+        progress = json.load(fh)
+    if ((progress['predictor'], progress['chunk_size'], progress.get('format'))
+            != (args.predictor, args.chunk_size, args.format)):
+        sys.exit("⚠️ Progress file was written with a different predictor, chunk size or format")
+    signature = _input_signature(args.input)
+    if any(progress.get(key) != value for key, value in signature.items()):
+        sys.exit(f"⚠️ Progress file was written for a different or modified input "
+                 f"({progress.get('input')})")
+    return progress
+
+
+def _save_progress(output, args, progress):
+    path = _progress_path(output)
+    progress.update(predictor=args.predictor, chunk_size=args.chunk_size, format=args.format,
+                    **_input_signature(args.input))
+    with open(path + '.tmp', 'w', encoding='utf-8') as fh:
+        json.dump(progress, fh)
+    os.replace(path + '.tmp', path)
+
+
+class _CsvWriter:
+    def __init__(self, output, bytes_done):
+        mode = 'r+b' if bytes_done and os.path.exists(output) else 'wb'
+        self.fh = open(output, mode)
+        # Drop anything written after the last checkpoint
+        self.fh.truncate(bytes_done)
+        self.fh.seek(bytes_done)
+
+    def write(self, index, results):
+        results.to_csv(self.fh, index=False, header=self.fh.tell() == 0)
+        self.fh.flush()
+        return self.fh.tell()
+
+    def close(self):
+        self.fh.close()
+
+
+class _ParquetWriter:
+    def __init__(self, output, bytes_done):
+        self.output = output
+        os.makedirs(output, exist_ok=True)
+
+    def write(self, index, results):
+        results.to_parquet(os.path.join(self.output, f"part-{index:05d}.parquet"), index=False)
+        return 0
+
+    def close(self):
+        pass
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Batch-score a CSV export with a predictor pipeline.")
+    parser.add_argument('predictor', choices=sorted(ARTIFACTS))
+    parser.add_argument('input', help="CSV file to score")
+    parser.add_argument('output', help="CSV file, or directory of part files for --format parquet")
+    parser.add_argument('--format', choices=['csv', 'parquet'], default='csv',
+                        help="parquet needs pyarrow (see requirements.txt)")
+    parser.add_argument('--chunk-size', type=int, default=50_000, help="rows per chunk")
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+    parser.add_argument('--resume', action='store_true', help="continue from the last completed chunk")
+    args = parser.parse_args(argv)
+
+    header = read_csv(args.input, nrows=0).columns
+    matched = match_columns(args.predictor, header)
+    missing = missing_fields(args.predictor, matched)
+    if missing:
+        sys.exit(f"⚠️ No columns found for: {', '.join(missing)}")
+
+    progress = _load_progress(args.output, args)
+    if progress['chunks_done']:
+        print(f"↩️ Resuming after chunk {progress['chunks_done']} ({progress['rows_done']} rows)")
+
+    writer_cls = _ParquetWriter if args.format == 'parquet' else _CsvWriter
+    writer = writer_cls(args.output, progress['bytes_done'])
+    chunks = read_csv(args.input, chunksize=args.chunk_size)
+    # Skip by record, not by line: quoted fields may span lines
+    for _ in range(progress['chunks_done']):
+        next(chunks)
+
+    start_time = time.time()
+    rows_scored = 0
+    next_index = progress['chunks_done']
+    pending, finished = set(), {}
+    max_in_flight = 2 * args.workers
+
+    with ProcessPoolExecutor(max_workers=args.workers, initializer=_init_worker,
+                             initargs=(args.predictor, matched)) as pool:
+        submitted = next_index
+        exhausted = False
+        while not exhausted or pending:
+            while not exhausted and len(pending) + len(finished) < max_in_flight:
+                chunk = next(chunks, None)
+                if chunk is None:
+                    exhausted = True
+                    break
+                pending.add(pool.submit(_score_chunk, submitted, chunk))
+                submitted += 1
+            if not pending:
+                continue
+
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                index, results = future.result()
+                finished[index] = results
+
+            # Write strictly in input order so resume offsets stay valid
+            while next_index in finished:
+                results = finished.pop(next_index)
+                progress['bytes_done'] = writer.write(next_index, results)
+                next_index += 1
+                rows_scored += len(results)
+                progress['chunks_done'] = next_index
+                progress['rows_done'] += len(results)
+                _save_progress(args.output, args, progress)
+
+                rate = rows_scored / max(time.time() - start_time, 1e-9)
+                print(f"📦 Chunk {next_index}: {progress['rows_done']:,} rows total "
+                      f"({rate:,.0f} rows/sec)")
+
+    writer.close()
+    if os.path.exists(_progress_path(args.output)):
+        os.remove(_progress_path(args.output))
+    elapsed = time.time() - start_time
+    print(f"✅ Scored {rows_scored:,} rows in {elapsed:.1f}s "
+          f"({rows_scored / max(elapsed, 1e-9):,.0f} rows/sec) -> {args.output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,147 @@
+"""Benchmark the single-pass field extractor against per-field regex loops.
+
+    python -m benchmarks.extraction [--repeat 200]
+
+Each report is parsed for every predictor both ways: the old loop runs one
+``re.search`` per field over the whole text, the extractor scans it once per
+predictor. The last column is a single scan for the fields of all four
+predictors at once.
+Reports are a typical lab panel, a long multi-page export and garbled OCR
+output. Disagreements between the two are listed at the end.
+"""
+import argparse
+import random
+import re
+import string
+import time
+
+from utils.extractor import extractor
+from utils.predictors import REPORT_FIELDS, convert_value, parse_fields
+
+# Per-field patterns the predictor pages used before utils.extractor: group 2
+# is the value, group 3 (if any) the unit
+LEGACY_PATTERNS = {
+    'diabetes': {
+        'age': r"(Age|AGE)\W*(\d+)\s*(years|yrs)?\b",
+        'glucose': r"(Glucose|GLU)\W*(\d+\.?\d*)\s*(mg/dL|mmol/L)?\b",
+        'bmi': r"(BMI|Body Mass Index)\W*(\d+\.?\d*)",
+        'hba1c': r"(HbA1c|A1C)\W*(\d+\.?\d*)\s*%?",
+        'fasting': r"(Fasting|FBS)\W*(\d+\.?\d*)\s*(mg/dL|mmol/L)?\b",
+        'post_meal': r"(Post\s*Meal|Postprandial|PPBS)\W*(\d+\.?\d*)\s*(mg/dL|mmol/L)?\b",
+        'gender': r"(Gender|Sex)\W*([MF])",
+        'family_history': r"(Family\s*History)\W*(Yes|No|Positive|Negative)",
+    },
+    'fever': {
+        'age': r"(Age|AGE)\W*(\d+)\s*(years|yrs)?\b",
+        'temp': r"(Temp|Temperature)\W*(\d+\.?\d*)\s*°?C?\b",
+        'duration': r"(Duration|Days)\W*(\d+)\s*(days)?\b",
+        'heart_rate': r"(Heart Rate|HR)\W*(\d+)\s*(bpm)?\b",
+        'severity': r"(Severity)\W*(None|Mild|Moderate|Severe)\b",
+        'dehydration': r"(Dehydration)\W*(None|Mild|Moderate|Severe)\b",
+        'gender': r"(Gender|Sex)\W*(Male|Female)\b",
+        'headache': r"(Headache)\W*(Yes|No)\b",
+        'muscle_pain': r"(Muscle Pain|Myalgia)\W*(Yes|No)\b",
+        'fatigue': r"(Fatigue)\W*(Yes|No)\b",
+        'chills': r"(Chills)\W*(Yes|No)\b",
+    },
+    'thyroid': {
+        'age': r"(Age|AGE)\W*(\d+)\s*(years|yrs)?\b",
+        'TSH': r"(TSH)\W*(\d+\.?\d*)\s*(mIU/L)?\b",
+        'T3': r"(T3|Triiodothyronine)\W*(\d+\.?\d*)\s*(pg/mL)?\b",
+        'T4': r"(T4|Thyroxine)\W*(\d+\.?\d*)\s*(μg/dL)?\b",
+        'TT4': r"(Total T4|TT4)\W*(\d+\.?\d*)\s*(μg/dL)?\b",
+        'T4U': r"(T4 Uptake|T4U)\W*(\d+\.?\d*)\s*%?\b",
+        'FTI': r"(FTI|Free Thyroid Index)\W*(\d+\.?\d*)\s*(μg/dL)?\b",
+    },
+    'bp': {
+        'age': r"(Age|AGE)\W*(\d+)\s*(years|yrs)?\b",
+        'weight': r"(Weight|WT)\W*(\d+\.?\d*)\s*(kg)?\b",
+        'height': r"(Height|HT)\W*(\d+\.?\d*)\s*(cm)?\b",
+        'systolic': r"(Systolic|SBP)\W*(\d+\.?\d*)\s*(mmHg)?\b",
+        'diastolic': r"(Diastolic|DBP)\W*(\d+\.?\d*)\s*(mmHg)?\b",
+        'cholesterol': r"(Cholesterol|CHOL)\W*(\d+\.?\d*)\s*(mg/dL)?\b",
+        'pulse': r"(Pulse|HR)\W*(\d+\.?\d*)\s*(bpm)?\b",
+        'gender': r"(Gender|Sex)\W*([MF])",
+    },
+}
+
+
+def legacy_parse_fields(name, text):
+    extracted = {}
+    for key, pattern in LEGACY_PATTERNS[name].items():
+        match = re.search(pattern, text, re.IGNORECASE)
+        if match:
+            unit = (match.group(3) or '') if match.re.groups > 2 else ''
+            try:
+                extracted[key] = convert_value(key, match.group(2), unit)
+            except ValueError:
+                continue
+    return extracted
+
+
+LAB_PANEL = """\
+Patient Report
+Age: 54 years    Sex: Male
+Glucose: 7.8 mmol/L   Fasting: 126 mg/dL   Post Meal: 182 mg/dL
+HbA1c: 6.9 %   BMI: 29.4   Family History: Positive
+Temperature: 38.6 °C   Heart Rate: 96 bpm   Duration: 4 days
+Severity: Moderate   Dehydration: Mild
+Headache: Yes   Muscle Pain: No   Fatigue: Yes   Chills: No
+TSH: 3.1 mIU/L   T3: 1.9 pg/mL   Thyroxine: 8.4 μg/dL
+Total T4: 112 μg/dL   T4 Uptake: 0.97 %   FTI: 108 μg/dL
+Weight: 82 kg   Height: 176 cm   Systolic: 138 mmHg   Diastolic: 88 mmHg
+Cholesterol: 212 mg/dL   Pulse: 78 bpm
+"""
+
+
+def make_reports(seed=0):
+    rng = random.Random(seed)
+    filler = "Reference ranges and comments for the panel above are on file.\n"
+    garbage = "".join(rng.choice(string.ascii_letters + string.digits + string.punctuation + " \n")
+                      for _ in range(50_000))
+    return {
+        'lab panel': LAB_PANEL,
+        'long export (30 pages)': LAB_PANEL + filler * 40 * 30,
+        'garbled OCR (50k chars)': garbage,
+        'digit runs': ("Age " + "1" * 5_000 + "x ") * 20,
+    }
+
+
+def _time(func, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - start) / repeat
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=200)
+    args = parser.parse_args(argv)
+
+    mismatches = []
+    for label, text in make_reports().items():
+        legacy = _time(lambda: [legacy_parse_fields(name, text) for name in REPORT_FIELDS],
+                       args.repeat)
+        single = _time(lambda: [parse_fields(name, text) for name in REPORT_FIELDS],
+                       args.repeat)
+        combined = _time(lambda: extractor.extract(text), args.repeat)
+        print(f"📄 {label}: per-field {legacy * 1e3:8.3f} ms | "
+              f"single pass {single * 1e3:8.3f} ms ({legacy / single:5.1f}x) | "
+              f"all fields {combined * 1e3:8.3f} ms ({legacy / combined:5.1f}x)")
+        for name in REPORT_FIELDS:
+            old, new = legacy_parse_fields(name, text), parse_fields(name, text)
+            for key in sorted(set(old) | set(new)):
+                if old.get(key) != new.get(key):
+                    mismatches.append((label, name, key, old.get(key), new.get(key)))
+
+    if mismatches:
+        print("⚠️ Fields that differ (report, predictor, field, per-field, single pass):")
+        for mismatch in mismatches:
+            print("   ", mismatch)
+    else:
+        print("✅ Both extractors agree on every report")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,79 @@
+"""Benchmark import time of the modules a page or the service starts with.
+
+    python -m benchmarks.import_time [--repeat 3] [module ...]
+
+Each module is imported in a fresh interpreter, so nothing is shared
+between measurements. "cold" runs with an empty bytecode cache
+(``PYTHONPYCACHEPREFIX`` pointing at a new directory), as on the first start
+after a deploy; "warm" is the best of ``--repeat`` runs once that cache is
+filled. The last column lists the heavy third-party packages the import
+pulled in, which should stay empty for the page and inference modules.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# What the predictor pages import at the top, then the upload and service paths
+DEFAULT_MODULES = [
+    'utils.predictors',
+    'utils.model_registry',
+    'utils.batch',
+    'utils.shared_report',
+    'utils.ingest',
+    'utils.ocr',
+    'score_service',
+]
+
+HEAVY = ['pandas', 'sklearn', 'scipy', 'joblib', 'PIL', 'pytesseract', 'PyPDF2', 'docx',
+         'thefuzz']
+
+_PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+print(json.dumps({{'seconds': elapsed,
+                   'heavy': [m for m in {heavy!r} if m in sys.modules]}}))
+"""
+
+
+def measure(module, pycache):
+    env = dict(os.environ, PYTHONPYCACHEPREFIX=pycache, PYTHONDONTWRITEBYTECODE='')
+    env['PYTHONPATH'] = os.pathsep.join(filter(None, [PROJECT_ROOT, env.get('PYTHONPATH')]))
+    out = subprocess.run([sys.executable, '-c', _PROBE.format(module=module, heavy=HEAVY)],
+                         env=env, cwd=PROJECT_ROOT, capture_output=True, text=True, check=True)
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('modules', nargs='*', default=DEFAULT_MODULES)
+    parser.add_argument('--repeat', type=int, default=3, help="warm runs per module")
+    args = parser.parse_args(argv)
+
+    baseline = {}
+    for module in ['numpy', 'streamlit']:
+        with tempfile.TemporaryDirectory() as pycache:
+            measure(module, pycache)
+            baseline[module] = min(measure(module, pycache)['seconds']
+                                   for _ in range(args.repeat))
+    print("📏 Warm baseline: " + ", ".join(f"{module} {seconds * 1e3:.0f} ms"
+                                         for module, seconds in baseline.items()))
+
+    for module in args.modules:
+        with tempfile.TemporaryDirectory() as pycache:
+            cold = measure(module, pycache)
+            warm = min((measure(module, pycache) for _ in range(args.repeat)),
+                       key=lambda result: result['seconds'])
+        heavy = ", ".join(warm['heavy']) or "-"
+        print(f"📦 {module:22s} cold {cold['seconds'] * 1e3:7.0f} ms | "
+              f"warm {warm['seconds'] * 1e3:7.0f} ms | heavy: {heavy}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,83 @@
+"""Benchmark single-row scoring throughput with and without micro-batching.
+
+    python -m benchmarks.microbatch [--predictor thyroid] [--clients 32] [--requests 4000]
+
+``--clients`` threads each send one-row requests through a ``MicroBatcher``
+in front of the pipeline until ``--requests`` have been scored, first with
+batching off and then for each ``--max-wait-ms``. Rows are random and the
+prediction cache is disabled, so every row reaches the forest.
+"""
+import argparse
+import itertools
+import threading
+import time
+
+import numpy as np
+
+from utils.microbatch import MicroBatcher
+from utils.model_registry import ARTIFACTS, get_pipeline
+
+
+def random_rows(pipeline, count, seed=0):
+    """Rows spread around the training data's feature ranges."""
+    rng = np.random.default_rng(seed)
+    scaler = pipeline['scaler']
+    return rng.normal(scaler.mean_, scaler.scale_, (count, len(scaler.mean_)))
+
+
+def run(batcher, rows, clients):
+    labels = [None] * len(rows)
+    indices = itertools.count()
+    lock = threading.Lock()
+
+    def client():
+        while True:
+            with lock:
+                i = next(indices)
+            if i >= len(rows):
+                return
+            scores, _ = batcher.score(rows[i])
+            labels[i] = scores[0].label
+
+    threads = [threading.Thread(target=client) for _ in range(clients)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return labels, time.perf_counter() - start
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--predictor', choices=sorted(ARTIFACTS), default='thyroid')
+    parser.add_argument('--clients', type=int, default=32)
+    parser.add_argument('--requests', type=int, default=4000)
+    parser.add_argument('--max-batch', type=int, default=64)
+    parser.add_argument('--max-wait-ms', type=float, nargs='+', default=[0.5, 1, 2, 5])
+    args = parser.parse_args(argv)
+
+    pipeline = get_pipeline(args.predictor)
+    pipeline.cache = None
+    rows = random_rows(pipeline, args.requests)
+    expected = [score.label for score in pipeline.score(rows)]
+
+    baseline = None
+    for wait_ms in [0, *args.max_wait_ms]:
+        batcher = MicroBatcher(lambda X: (pipeline.score(X), pipeline.version),
+                               max_batch=args.max_batch, max_wait=wait_ms / 1000)
+        labels, elapsed = run(batcher, rows, args.clients)
+        rate = len(rows) / elapsed
+        baseline = baseline or rate
+        metrics = batcher.metrics.snapshot()
+        delay = metrics['queue_delay_ms']
+        print(f"⏱️ max wait {wait_ms:4.1f} ms: {rate:8,.0f} req/s ({rate / baseline:4.1f}x) | "
+              f"mean batch {metrics['mean_batch_rows']:5.1f} rows | "
+              f"queue delay mean {delay['mean']:6.3f} ms p95 {delay.get('p95', 0):6.3f} ms")
+        if labels != expected:
+            print("⚠️ Batched labels differ from scoring all rows at once")
+    print(f"✅ {args.clients} clients, {len(rows):,} single-row requests each run")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,81 @@
+"""Benchmark per-image OCR latency of each available OCR backend.
+
+    python -m benchmarks.ocr_backends [--corpus DIR] [--count N] [--repeat N]
+
+Every image is preprocessed once and then read by each backend ``--repeat``
+times. The first call of the in-process backend includes loading the
+language model, so it is reported separately from the steady-state mean.
+pytesseract pays that start-up in every call.
+"""
+import argparse
+import io
+import statistics
+import time
+
+from PIL import Image
+
+from benchmarks.ocr_preprocess import folder_corpus, recall, synthetic_corpus
+from utils.ocr import _fast_whitelist
+from utils.ocr_backends import BACKENDS, load_backend
+from utils.preprocess import preprocess_image
+
+
+def available_backends():
+    for name in BACKENDS:
+        try:
+            backend = load_backend(name, _fast_whitelist())
+        except ImportError:
+            print(f"⚠️ {name}: not installed")
+            continue
+        if not backend.available():
+            print(f"⚠️ {name}: tesseract not found")
+            continue
+        yield backend
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--corpus', help="directory of report images")
+    parser.add_argument('--count', type=int, default=4, help="synthetic images to generate")
+    parser.add_argument('--repeat', type=int, default=3, help="reads of each image per backend")
+    args = parser.parse_args(argv)
+
+    backends = list(available_backends())
+    if not backends:
+        print("❌ No OCR backend available")
+        return
+
+    corpus = folder_corpus(args.corpus) if args.corpus else synthetic_corpus(args.count)
+    images = []
+    for label, data, expected in corpus:
+        prepared, dpi = preprocess_image(Image.open(io.BytesIO(data)))
+        images.append((label, prepared, dpi, expected))
+    print(f"🖼️ {len(images)} images preprocessed")
+
+    for backend in backends:
+        first = None
+        timings, recalls = [], []
+        for label, image, dpi, expected in images:
+            for _ in range(args.repeat):
+                start = time.perf_counter()
+                text = backend.image_to_string(image, dpi=dpi)
+                elapsed = time.perf_counter() - start
+                if first is None:
+                    first = elapsed
+                else:
+                    timings.append(elapsed)
+            score = recall(text, expected)
+            if score is not None:
+                recalls.append(score)
+
+        line = f"⏱️ {backend.name:12s} first call {first * 1e3:7.0f} ms"
+        if timings:
+            line += (f" | mean {statistics.mean(timings) * 1e3:7.0f} ms"
+                     f" | median {statistics.median(timings) * 1e3:7.0f} ms per image")
+        if recalls:
+            line += f" | recall {statistics.mean(recalls):.0%}"
+        print(line)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,116 @@
+"""Benchmark OCR latency and field recall with and without preprocessing.
+
+    python -m benchmarks.ocr_preprocess [--corpus DIR] [--deskew]
+
+``--corpus`` points at a directory of report images. Expected field values
+are read from a ``<image stem>.json`` next to each image when present;
+recall is only reported for those. Without a corpus, phone-photo-like
+images of a lab panel are generated: 12 megapixels, uneven lighting, sensor
+noise, a slight tilt and an EXIF rotation.
+"""
+import argparse
+import io
+import json
+import os
+import time
+
+import numpy as np
+from PIL import Image, ImageDraw, ImageFont
+
+from benchmarks.extraction import LAB_PANEL
+from utils.ocr import backend, ocr_image
+from utils.predictors import parse_fields
+from utils.preprocess import preprocess_image
+
+IMAGE_SUFFIXES = ('.png', '.jpg', '.jpeg', '.tif', '.tiff')
+
+
+def synthetic_corpus(count, seed=0):
+    rng = np.random.default_rng(seed)
+    text = LAB_PANEL.replace('μ', 'u')
+    expected = parse_fields(None, text)
+    font = ImageFont.load_default(size=56)
+    for i in range(count):
+        page = Image.new('L', (3024, 4032), 235)
+        ImageDraw.Draw(page).multiline_text((150, 300), text, fill=25, font=font, spacing=40)
+        shade = np.linspace(0.55, 1.0, page.width, dtype=np.float32)[np.newaxis, :]
+        pixels = np.asarray(page, dtype=np.float32) * shade
+        pixels += rng.normal(0, 12, pixels.shape)
+        page = Image.fromarray(np.clip(pixels, 0, 255).astype(np.uint8)).convert('RGB')
+        page = page.rotate(float(rng.uniform(-2.5, 2.5)), expand=True, fillcolor=(200, 200, 200))
+
+        # Stored sideways, with EXIF telling viewers to rotate it back
+        exif = Image.Exif()
+        exif[0x0112] = 6
+        buffer = io.BytesIO()
+        page.transpose(Image.Transpose.ROTATE_90).save(buffer, format='JPEG', quality=90, exif=exif)
+        yield f"synthetic-{i}", buffer.getvalue(), expected
+
+
+def folder_corpus(folder):
+    for file_name in sorted(os.listdir(folder)):
+        stem, suffix = os.path.splitext(file_name)
+        if suffix.lower() not in IMAGE_SUFFIXES:
+            continue
+        with open(os.path.join(folder, file_name), 'rb') as fh:
+            data = fh.read()
+        expected = None
+        sidecar = os.path.join(folder, stem + '.json')
+        if os.path.exists(sidecar):
+            with open(sidecar, encoding='utf-8') as fh:
+                expected = json.load(fh)
+        yield file_name, data, expected
+
+
+def recall(text, expected):
+    if not expected:
+        return None
+    found = parse_fields(None, text)
+    return sum(found.get(key) == value for key, value in expected.items()) / len(expected)
+
+
+def _fmt_recall(value):
+    return "   n/a" if value is None else f"{value:6.0%}"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--corpus', help="directory of report images")
+    parser.add_argument('--count', type=int, default=4, help="synthetic images to generate")
+    parser.add_argument('--deskew', action='store_true')
+    args = parser.parse_args(argv)
+
+    have_tesseract = backend.available()
+    if not have_tesseract:
+        print("⚠️ tesseract not found: timing preprocessing only")
+
+    corpus = folder_corpus(args.corpus) if args.corpus else synthetic_corpus(args.count)
+    totals = {'raw': [], 'prepared': [], 'preprocess': []}
+    for label, data, expected in corpus:
+        image = Image.open(io.BytesIO(data))
+        start = time.perf_counter()
+        prepared, dpi = preprocess_image(image, deskew=args.deskew)
+        totals['preprocess'].append(time.perf_counter() - start)
+        line = (f"🖼️ {label}: {image.width}x{image.height} -> {prepared.width}x{prepared.height} "
+                f"@ {dpi} dpi, preprocess {totals['preprocess'][-1] * 1e3:6.0f} ms")
+
+        if have_tesseract:
+            results = {}
+            for mode, preprocess in (('raw', False), ('prepared', True)):
+                start = time.perf_counter()
+                text = ocr_image(Image.open(io.BytesIO(data)), preprocess=preprocess)
+                totals[mode].append(time.perf_counter() - start)
+                results[mode] = recall(text, expected)
+            line += (f" | OCR raw {totals['raw'][-1]:5.2f} s recall {_fmt_recall(results['raw'])}"
+                     f" | OCR prepared {totals['prepared'][-1]:5.2f} s "
+                     f"recall {_fmt_recall(results['prepared'])}")
+        print(line)
+
+    if totals['raw']:
+        raw, prepared = sum(totals['raw']), sum(totals['prepared'])
+        print(f"✅ OCR time {raw:.1f}s -> {prepared:.1f}s ({raw / prepared:.1f}x faster) "
+              f"over {len(totals['raw'])} images")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,14 +1,13 @@
 import streamlit as st
-import joblib
 import numpy as np
-import pandas as pd
-from PIL import Image
-import pytesseract
-import re
-import tempfile
-from PyPDF2 import PdfReader
 import time
 
+from utils.batch import render_batch_results
+from utils.model_registry import get_pipeline
+from utils.predictors import MIN_MATCHED, column_value, match_columns, read_csv
+from utils.shared_report import load_shared_report, render_shared_report_notice
+from utils.warmup import start_warmup
+
 # Configure page settings
 st.set_page_config(
     page_title="Blood Pressure Checker",
@@ -75,19 +74,19 @@ st.markdown('''
 
 # Load model pipeline
 try:
-    pipeline = joblib.load('models/bp_model.pkl')
-    model = pipeline['model']
-    scaler = pipeline['scaler']
-    encoder = pipeline['encoder']
+    pipeline = get_pipeline('bp')
     gender_map = pipeline['gender_mapping']
 except Exception as e:
     st.error(f"Error loading model: {str(e)}")
     st.stop()
 
+# Warm up the other predictors too if the app was entered on this page
+start_warmup()
+
 # Report Upload Section
-with st.expander("📁 Upload Medical Report (CSV/Image/PDF)"):
+with st.expander("📁 Upload Medical Report (CSV/Image/PDF/DOCX)"):
     uploaded_file = st.file_uploader("Upload report", 
-                                   type=["csv", "png", "jpg", "jpeg", "pdf"],
+                                   type=["csv", "png", "jpg", "jpeg", "pdf", "docx"],
                                    key="bp_report_uploader")
     
     col_temp, col_clear = st.columns(2)
@@ -103,92 +102,40 @@ with st.expander("📁 Upload Medical Report (CSV/Image/PDF)"):
     with col_clear:
         if st.button("🧹 Clear Data", key="bp_clear_data"):
             st.session_state.clear()
-            st.experimental_rerun()
+            st.rerun()
 
     if uploaded_file is not None:
         try:
             start_time = time.time()
             extracted = {}
             
-            if uploaded_file.type == "application/pdf":
-                with tempfile.NamedTemporaryFile(delete=False) as tmp:
-                    tmp.write(uploaded_file.getvalue())
-                    reader = PdfReader(tmp.name)
-                    text = ""
-                    for page in reader.pages:
-                        text += page.extract_text() + "\n"
-                
-                if len(text.strip()) < 50:
-                    st.info("Attempting OCR on PDF pages...")
-                    for page in reader.pages:
-                        for img in page.images:
-                            with tempfile.NamedTemporaryFile(delete=False) as tmp_img:
-                                tmp_img.write(img.data)
-                                image = Image.open(tmp_img.name)
-                                text += pytesseract.image_to_string(image) + "\n"
-
-            elif uploaded_file.type.startswith('image'):
-                image = Image.open(uploaded_file)
-                text = pytesseract.image_to_string(image)
+            if uploaded_file.type == "text/csv":
+                df = read_csv(uploaded_file)
+                matched_cols = match_columns('bp', df.columns)
 
-            elif uploaded_file.type == "text/csv":
-                df = pd.read_csv(uploaded_file)
-                column_map = {
-                    'age': ['age', 'patient age', 'years'],
-                    'gender': ['gender', 'sex'],
-                    'weight': ['weight', 'wt', 'body weight'],
-                    'height': ['height', 'ht', 'body height'],
-                    'systolic': ['systolic', 'sys', 'sbp'],
-                    'diastolic': ['diastolic', 'dia', 'dbp'],
-                    'cholesterol': ['cholesterol', 'chol', 'tc'],
-                    'pulse': ['pulse', 'heart rate', 'hr']
-                }
-                
-                matched_cols = {}
-                for col in df.columns:
-                    col_lower = col.strip().lower()
-                    for key, aliases in column_map.items():
-                        if col_lower in aliases:
-                            matched_cols[key] = col
-                            break
-                
-                if len(matched_cols) >= 5:
+                if len(matched_cols) >= MIN_MATCHED['bp']:
                     for key, source_col in matched_cols.items():
-                        extracted[key] = df[source_col].iloc[0]
+                        extracted[key] = column_value(key, df, source_col)
 
-            if uploaded_file.type != "text/csv":
-                patterns = {
-                    'age': r"(Age|AGE)\W*(\d+)\s*(years|yrs)?\b",
-                    'weight': r"(Weight|WT)\W*(\d+\.?\d*)\s*(kg)?\b",
-                    'height': r"(Height|HT)\W*(\d+\.?\d*)\s*(cm)?\b",
-                    'systolic': r"(Systolic|SBP)\W*(\d+\.?\d*)\s*(mmHg)?\b",
-                    'diastolic': r"(Diastolic|DBP)\W*(\d+\.?\d*)\s*(mmHg)?\b",
-                    'cholesterol': r"(Cholesterol|CHOL)\W*(\d+\.?\d*)\s*(mg/dL)?\b",
-                    'pulse': r"(Pulse|HR)\W*(\d+\.?\d*)\s*(bpm)?\b",
-                    'gender': r"(Gender|Sex)\W*([MF])"
-                }
+                if len(df) > 1:
+                    render_batch_results('bp', pipeline, df, matched_cols,
+                                         key="bp_batch_download")
 
-                for key, pattern in patterns.items():
-                    matches = re.findall(pattern, text, re.IGNORECASE)
-                    if matches:
-                        try:
-                            value = matches[0][1].strip()
-                            if key == 'gender':
-                                extracted[key] = 'Male' if value.upper() == 'M' else 'Female'
-                            else:
-                                extracted[key] = float(value)
-                        except:
-                            continue
+            else:
+                extracted = load_shared_report(uploaded_file, 'bp')
 
             if extracted:
                 st.session_state.update(extracted)
                 st.success(f"Processed in {time.time()-start_time:.1f}s")
-            else:
+            elif extracted is not None:
                 st.warning("No values found in document")
 
         except Exception as e:
             st.error(f"Error processing file: {str(e)}")
 
+if uploaded_file is None:
+    render_shared_report_notice('bp')
+
 # Input Fields with Validation
 def validate_value(key, default, min_val, max_val):
     value = st.session_state.get(key, default)
@@ -247,14 +194,14 @@ if st.button('Predict Blood Pressure Status', key="bp_predict_button"):
             systolic, diastolic, cholesterol, pulse
         ]])
         
-        scaled_data = scaler.transform(input_data)
-        prediction = model.predict(scaled_data)
-        condition = encoder.inverse_transform(prediction)[0]
-        probabilities = model.predict_proba(scaled_data)[0]
+        result = pipeline.score(input_data)[0]
+        condition = result.label
+        confidence = result.top_k[0][1]
         
         st.markdown(f"""
             <div class="prediction-box {condition.replace(' ', '-')}">
                 <h3>{condition}</h3>
+                <p>Confidence: {confidence*100:.1f}%</p>
             </div>
         """, unsafe_allow_html=True)
 
@@ -1,14 +1,13 @@
 import streamlit as st
-import joblib
 import numpy as np
-import pandas as pd
-from PIL import Image
-import pytesseract
-import re
-import tempfile
-from PyPDF2 import PdfReader
 import time
 
+from utils.batch import render_batch_results
+from utils.model_registry import get_pipeline
+from utils.predictors import MIN_MATCHED, column_value, match_columns, read_csv
+from utils.shared_report import load_shared_report, render_shared_report_notice
+from utils.warmup import start_warmup
+
 # Configure page settings
 st.set_page_config(
     page_title="Diabetes Predictor",
@@ -76,25 +75,25 @@ st.markdown('''
 
 # Load model pipeline
 try:
-    pipeline = joblib.load('models/diabetes_model.pkl')
-    model = pipeline['model']
-    scaler = pipeline['scaler']
-    encoder = pipeline['encoder']
+    pipeline = get_pipeline('diabetes')
     gender_map = pipeline['gender_mapping']
     family_history_map = pipeline['family_history_mapping']
 except Exception as e:
     st.error(f"Error loading model: {str(e)}")
     st.stop()
 
+# Warm up the other predictors too if the app was entered on this page
+start_warmup()
+
 # Report Upload Section
-with st.expander("📁 Upload Lab Report (CSV/Image/PDF)", expanded=False):
+with st.expander("📁 Upload Lab Report (CSV/Image/PDF/DOCX)", expanded=False):
     uploaded_file = st.file_uploader("Upload medical report", 
-                                   type=["csv", "png", "jpg", "jpeg", "pdf"],
+                                   type=["csv", "png", "jpg", "jpeg", "pdf", "docx"],
                                    key="report_uploader")
     
     col_temp, col_clear = st.columns(2)
     with col_temp:
-        template_csv = open('datasets/diabetes_template.csv', 'rb')
+        template_csv = open('templates/diabetes_template.csv', 'rb')
         st.download_button(
             label="Download CSV Template",
             data=template_csv,
@@ -105,101 +104,42 @@ with st.expander("📁 Upload Lab Report (CSV/Image/PDF)", expanded=False):
     with col_clear:
         if st.button("🧹 Clear Uploaded Data", key="clear_data"):
             st.session_state.clear()
-            st.experimental_rerun()
+            st.rerun()
 
     if uploaded_file is not None:
         try:
             start_time = time.time()
             extracted = {}
             
-            if uploaded_file.type == "application/pdf":
-                with tempfile.NamedTemporaryFile(delete=False) as tmp:
-                    tmp.write(uploaded_file.getvalue())
-                    reader = PdfReader(tmp.name)
-                    text = ""
-                    for page in reader.pages:
-                        text += page.extract_text() + "\n"
-                
-                if len(text.strip()) < 50:
-                    st.info("Attempting OCR on PDF pages...")
-                    for page in reader.pages:
-                        for img in page.images:
-                            with tempfile.NamedTemporaryFile(delete=False) as tmp_img:
-                                tmp_img.write(img.data)
-                                image = Image.open(tmp_img.name)
-                                text += pytesseract.image_to_string(image) + "\n"
-
-            elif uploaded_file.type.startswith('image'):
-                image = Image.open(uploaded_file)
-                text = pytesseract.image_to_string(image)
+            if uploaded_file.type == "text/csv":
+                df = read_csv(uploaded_file)
+                matched_cols = match_columns('diabetes', df.columns)
 
-            elif uploaded_file.type == "text/csv":
-                df = pd.read_csv(uploaded_file)
-                column_map = {
-                    'age': ['age', 'patient age', 'years'],
-                    'gender': ['gender', 'sex'],
-                    'bmi': ['bmi', 'body mass index'],
-                    'glucose': ['glucose', 'blood glucose', 'glu'],
-                    'hba1c': ['hba1c', 'a1c', 'glycated hemoglobin'],
-                    'fasting': ['fasting', 'fbs', 'fasting blood sugar'],
-                    'post_meal': ['post meal', 'postprandial', 'ppbs'],
-                    'family_history': ['family history', 'diabetes history']
-                }
-                
-                matched_cols = {}
-                for col in df.columns:
-                    col_lower = col.strip().lower()
-                    for key, aliases in column_map.items():
-                        if col_lower in aliases:
-                            matched_cols[key] = col
-                            break
-                
-                if len(matched_cols) >= 5:
+                if len(matched_cols) >= MIN_MATCHED['diabetes']:
                     for key, source_col in matched_cols.items():
-                        extracted[key] = df[source_col].iloc[0]
+                        extracted[key] = column_value(key, df, source_col)
 
-            if uploaded_file.type != "text/csv":
-                patterns = {
-                    'age': r"(Age|AGE)\W*(\d+)\s*(years|yrs)?\b",
-                    'glucose': r"(Glucose|GLU)\W*(\d+\.?\d*)\s*(mg/dL|mmol/L)?\b",
-                    'bmi': r"(BMI|Body Mass Index)\W*(\d+\.?\d*)",
-                    'hba1c': r"(HbA1c|A1C)\W*(\d+\.?\d*)\s*%?",
-                    'fasting': r"(Fasting|FBS)\W*(\d+\.?\d*)\s*(mg/dL|mmol/L)?\b",
-                    'post_meal': r"(Post\s*Meal|Postprandial|PPBS)\W*(\d+\.?\d*)\s*(mg/dL|mmol/L)?\b",
-                    'gender': r"(Gender|Sex)\W*([MF])",
-                    'family_history': r"(Family\s*History)\W*(Yes|No|Positive|Negative)"
-                }
+                if len(df) > 1:
+                    render_batch_results('diabetes', pipeline, df, matched_cols,
+                                         key="batch_download")
 
-                for key, pattern in patterns.items():
-                    matches = re.findall(pattern, text, re.IGNORECASE)
-                    if matches:
-                        try:
-                            value = matches[0][1].strip()
-                            unit = matches[0][2].lower() if len(matches[0])>2 else ''
-                            
-                            if key == 'gender':
-                                extracted[key] = 'Male' if value.upper() == 'M' else 'Female'
-                            elif key == 'family_history':
-                                extracted[key] = 'Yes' if value.lower() in ['yes', 'positive'] else 'No'
-                            elif key in ['glucose', 'fasting', 'post_meal'] and 'mmol/l' in unit:
-                                extracted[key] = float(value) * 18.0182
-                            else:
-                                extracted[key] = float(value)
-                        except:
-                            continue
+            else:
+                extracted = load_shared_report(uploaded_file, 'diabetes')
 
             if extracted:
                 st.session_state.update(extracted)
                 st.success(f"Processed in {time.time()-start_time:.1f}s")
-            else:
+            elif extracted is not None:
                 st.warning("No values found in document")
 
-            uploaded_file = None
             st.session_state.file_processed = True
 
         except Exception as e:
             st.error(f"Error processing file: {str(e)}")
 
+if uploaded_file is None:
+    render_shared_report_notice('diabetes')
+
 # Input Fields with Unique Keys
 def validate_value(key, default, min_val, max_val):
     value = st.session_state.get(key, default)
@@ -254,13 +194,14 @@ if st.button('Assess Diabetes Risk', key="predict_button"):
             hba1c, fasting, post_meal, family_history_map[family_history]
         ]])
         
-        scaled_data = scaler.transform(input_data)
-        prediction = model.predict(scaled_data)
-        condition = encoder.inverse_transform(prediction)[0]
+        result = pipeline.score(input_data)[0]
+        condition = result.label
+        confidence = result.top_k[0][1]
         
         st.markdown(f"""
             <div class="prediction-box {condition.replace(' ', '-')}">
                 <h3>{condition}</h3>
+                <p>Confidence: {confidence*100:.1f}%</p>
             </div>
         """, unsafe_allow_html=True)
 
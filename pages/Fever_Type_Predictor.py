@@ -1,14 +1,13 @@
 import streamlit as st
-import joblib
 import numpy as np
-import pandas as pd
-from PIL import Image
-import pytesseract
-import re
-import tempfile
-from PyPDF2 import PdfReader
 import time
 
+from utils.batch import render_batch_results
+from utils.model_registry import get_pipeline
+from utils.predictors import MIN_MATCHED, column_value, match_columns, read_csv
+from utils.shared_report import load_shared_report, render_shared_report_notice
+from utils.warmup import start_warmup
+
 # Configure page settings
 st.set_page_config(
     page_title="Fever Type Predictor",
@@ -75,20 +74,20 @@ st.markdown('''
 
 # Load model pipeline
 try:
-    pipeline = joblib.load('models/fever_model.pkl')
-    model = pipeline['model']
-    scaler = pipeline['scaler']
-    encoder = pipeline['encoder']
+    pipeline = get_pipeline('fever')
     gender_map = pipeline['gender_mapping']
     severity_map = pipeline['severity_mapping']
 except Exception as e:
     st.error(f"Error loading model: {str(e)}")
     st.stop()
 
+# Warm up the other predictors too if the app was entered on this page
+start_warmup()
+
 # Report Upload Section
-with st.expander("📁 Upload Medical Report (CSV/Image/PDF)"):
+with st.expander("📁 Upload Medical Report (CSV/Image/PDF/DOCX)"):
     uploaded_file = st.file_uploader("Upload report", 
-                                   type=["csv", "png", "jpg", "jpeg", "pdf"],
+                                   type=["csv", "png", "jpg", "jpeg", "pdf", "docx"],
                                    key="fever_report_uploader")
     
     col_temp, col_clear = st.columns(2)
@@ -104,102 +103,44 @@ with st.expander("📁 Upload Medical Report (CSV/Image/PDF)"):
     with col_clear:
         if st.button("🧹 Clear Data", key="fever_clear_data"):
             st.session_state.clear()
-            st.experimental_rerun()
+            st.rerun()
 
     if uploaded_file is not None:
         try:
             start_time = time.time()
             extracted = {}
             
-            if uploaded_file.type == "application/pdf":
-                with tempfile.NamedTemporaryFile(delete=False) as tmp:
-                    tmp.write(uploaded_file.getvalue())
-                    reader = PdfReader(tmp.name)
-                    text = ""
-                    for page in reader.pages:
-                        text += page.extract_text() + "\n"
-                
-                if len(text.strip()) < 50:
-                    st.info("Attempting OCR on PDF pages...")
-                    for page in reader.pages:
-                        for img in page.images:
-                            with tempfile.NamedTemporaryFile(delete=False) as tmp_img:
-                                tmp_img.write(img.data)
-                                image = Image.open(tmp_img.name)
-                                text += pytesseract.image_to_string(image) + "\n"
-
-            elif uploaded_file.type.startswith('image'):
-                image = Image.open(uploaded_file)
-                text = pytesseract.image_to_string(image)
+            if uploaded_file.type == "text/csv":
+                df = read_csv(uploaded_file)
+                matched_cols = match_columns('fever', df.columns)
 
-            elif uploaded_file.type == "text/csv":
-                df = pd.read_csv(uploaded_file)
-                column_map = {
-                    'age': ['age', 'patient age'],
-                    'gender': ['gender', 'sex'],
-                    'temp': ['temp', 'temperature'],
-                    'duration': ['duration', 'days'],
-                    'heart_rate': ['heart_rate', 'hr', 'pulse'],
-                    'severity': ['severity', 'severity_level'],
-                    'dehydration': ['dehydration', 'hydration'],
-                    'headache': ['headache', 'head_pain'],
-                    'muscle_pain': ['muscle_pain', 'myalgia'],
-                    'fatigue': ['fatigue', 'tiredness'],
-                    'chills': ['chills', 'shivering']
-                }
-                
-                matched_cols = {}
-                for col in df.columns:
-                    col_lower = col.strip().lower()
-                    for key, aliases in column_map.items():
-                        if col_lower in aliases:
-                            matched_cols[key] = col
-                            break
-                
-                if len(matched_cols) >= 5:
+                if len(matched_cols) >= MIN_MATCHED['fever']:
                     for key, source_col in matched_cols.items():
-                        value = df[source_col].iloc[0]
+                        value = column_value(key, df, source_col)
                         if key in ['headache', 'muscle_pain', 'fatigue', 'chills']:
                             extracted[key] = 'Yes' if value else 'No'
                         else:
                             extracted[key] = value
 
-            if uploaded_file.type != "text/csv":
-                patterns = {
-                    'age': r"(Age|AGE)\W*(\d+)\s*(years|yrs)?\b",
-                    'temp': r"(Temp|Temperature)\W*(\d+\.?\d*)\s*°?C?\b",
-                    'duration': r"(Duration|Days)\W*(\d+)\s*(days)?\b",
-                    'heart_rate': r"(Heart Rate|HR)\W*(\d+)\s*(bpm)?\b",
-                    'severity': r"(Severity)\W*(None|Mild|Moderate|Severe)\b",
-                    'dehydration': r"(Dehydration)\W*(None|Mild|Moderate|Severe)\b",
-                    'gender': r"(Gender|Sex)\W*(Male|Female)\b",
-                    'headache': r"(Headache)\W*(Yes|No)\b",
-                    'muscle_pain': r"(Muscle Pain|Myalgia)\W*(Yes|No)\b",
-                    'fatigue': r"(Fatigue)\W*(Yes|No)\b",
-                    'chills': r"(Chills)\W*(Yes|No)\b"
-                }
+                if len(df) > 1:
+                    render_batch_results('fever', pipeline, df, matched_cols,
+                                         key="fever_batch_download")
 
-                for key, pattern in patterns.items():
-                    match = re.search(pattern, text, re.IGNORECASE)
-                    if match:
-                        try:
-                            value = match.group(2).strip()
-                            if key in ['headache', 'muscle_pain', 'fatigue', 'chills']:
-                                extracted[key] = 'Yes' if value.lower() == 'yes' else 'No'
-                            else:
-                                extracted[key] = value
-                        except:
-                            continue
+            else:
+                extracted = load_shared_report(uploaded_file, 'fever')
 
             if extracted:
                 st.session_state.update(extracted)
                 st.success(f"Processed in {time.time()-start_time:.1f}s")
-            else:
+            elif extracted is not None:
                 st.warning("No values found in document")
 
         except Exception as e:
             st.error(f"Error processing file: {str(e)}")
 
+if uploaded_file is None:
+    render_shared_report_notice('fever')
+
 # Input Fields with Validation
 def validate_value(key, default, min_val, max_val):
     value = st.session_state.get(key, default)
@@ -276,14 +217,14 @@ if st.button('Predict Fever Type', key="fever_predict_button"):
             heart_rate
         ]])
         
-        scaled_data = scaler.transform(input_data)
-        prediction = model.predict(scaled_data)
-        condition = encoder.inverse_transform(prediction)[0]
-        probabilities = model.predict_proba(scaled_data)[0]
+        result = pipeline.score(input_data)[0]
+        condition = result.label
+        confidence = result.top_k[0][1]
         
         st.markdown(f"""
             <div class="prediction-box {condition.replace(' ', '-')}">
                 <h3>{condition}</h3>
+                <p>Confidence: {confidence*100:.1f}%</p>
             </div>
         """, unsafe_allow_html=True)
 
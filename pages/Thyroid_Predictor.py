@@ -1,14 +1,13 @@
 import streamlit as st
-import joblib
 import numpy as np
-import pandas as pd
-from PIL import Image
-import pytesseract
-import re
-import tempfile
-from PyPDF2 import PdfReader
 import time
 
+from utils.batch import render_batch_results
+from utils.model_registry import get_pipeline
+from utils.predictors import MIN_MATCHED, column_value, match_columns, read_csv
+from utils.shared_report import load_shared_report, render_shared_report_notice
+from utils.warmup import start_warmup
+
 # Configure page settings
 st.set_page_config(
     page_title="Thyroid Checker",
@@ -76,18 +75,18 @@ st.markdown('''
 
 # Load model pipeline
 try:
-    pipeline = joblib.load('models/thyroid_model.pkl')
-    model = pipeline['model']
-    scaler = pipeline['scaler']
-    encoder = pipeline['encoder']
+    pipeline = get_pipeline('thyroid')
 except Exception as e:
     st.error(f"Error loading model: {str(e)}")
     st.stop()
 
+# Warm up the other predictors too if the app was entered on this page
+start_warmup()
+
 # Report Upload Section
-with st.expander("📁 Upload Lab Report (CSV/Image/PDF)"):
+with st.expander("📁 Upload Lab Report (CSV/Image/PDF/DOCX)"):
     uploaded_file = st.file_uploader("Upload report", 
-                                   type=["csv", "png", "jpg", "jpeg", "pdf"],
+                                   type=["csv", "png", "jpg", "jpeg", "pdf", "docx"],
                                    key="thyroid_report_uploader")
     
     col_temp, col_clear = st.columns(2)
@@ -110,80 +109,33 @@ with st.expander("📁 Upload Lab Report (CSV/Image/PDF)"):
             start_time = time.time()
             extracted = {}
             
-            if uploaded_file.type == "application/pdf":
-                with tempfile.NamedTemporaryFile(delete=False) as tmp:
-                    tmp.write(uploaded_file.getvalue())
-                    reader = PdfReader(tmp.name)
-                    text = ""
-                    for page in reader.pages:
-                        text += page.extract_text() + "\n"
-                
-                if len(text.strip()) < 50:
-                    st.info("Attempting OCR on PDF pages...")
-                    for page in reader.pages:
-                        for img in page.images:
-                            with tempfile.NamedTemporaryFile(delete=False) as tmp_img:
-                                tmp_img.write(img.data)
-                                image = Image.open(tmp_img.name)
-                                text += pytesseract.image_to_string(image) + "\n"
-
-            elif uploaded_file.type.startswith('image'):
-                image = Image.open(uploaded_file)
-                text = pytesseract.image_to_string(image)
+            if uploaded_file.type == "text/csv":
+                df = read_csv(uploaded_file)
+                matched_cols = match_columns('thyroid', df.columns)
 
-            elif uploaded_file.type == "text/csv":
-                df = pd.read_csv(uploaded_file)
-                column_map = {
-                    'age': ['age', 'patient age'],
-                    'TSH': ['tsh', 'thyroid stimulating hormone'],
-                    'T3': ['t3', 'triiodothyronine'],
-                    'T4': ['t4', 'thyroxine'],
-                    'TT4': ['tt4', 'total t4'],
-                    'T4U': ['t4u', 't4 uptake'],
-                    'FTI': ['fti', 'free thyroid index']
-                }
-                
-                matched_cols = {}
-                for col in df.columns:
-                    col_lower = col.strip().lower()
-                    for key, aliases in column_map.items():
-                        if col_lower in aliases:
-                            matched_cols[key] = col
-                            break
-                
-                if len(matched_cols) >= 4:
+                if len(matched_cols) >= MIN_MATCHED['thyroid']:
                     for key, source_col in matched_cols.items():
-                        extracted[key] = df[source_col].iloc[0]
+                        extracted[key] = column_value(key, df, source_col)
 
-            if uploaded_file.type != "text/csv":
-                patterns = {
-                    'age': r"(Age|AGE)\W*(\d+)\s*(years|yrs)?\b",
-                    'TSH': r"(TSH)\W*(\d+\.?\d*)\s*(mIU/L)?\b",
-                    'T3': r"(T3|Triiodothyronine)\W*(\d+\.?\d*)\s*(pg/mL)?\b",
-                    'T4': r"(T4|Thyroxine)\W*(\d+\.?\d*)\s*(μg/dL)?\b",
-                    'TT4': r"(Total T4|TT4)\W*(\d+\.?\d*)\s*(μg/dL)?\b",
-                    'T4U': r"(T4 Uptake|T4U)\W*(\d+\.?\d*)\s*%?\b",
-                    'FTI': r"(FTI|Free Thyroid Index)\W*(\d+\.?\d*)\s*(μg/dL)?\b"
-                }
+                if len(df) > 1:
+                    render_batch_results('thyroid', pipeline, df, matched_cols,
+                                         key="thyroid_batch_download")
 
-                for key, pattern in patterns.items():
-                    match = re.search(pattern, text, re.IGNORECASE)
-                    if match:
-                        try:
-                            value = float(match.group(2))
-                            extracted[key] = value
-                        except:
-                            continue
+            else:
+                extracted = load_shared_report(uploaded_file, 'thyroid')
 
             if extracted:
                 st.session_state.update(extracted)
                 st.success(f"Processed in {time.time()-start_time:.1f}s")
-            else:
+            elif extracted is not None:
                 st.warning("No values found in document")
 
         except Exception as e:
             st.error(f"Error processing file: {str(e)}")
 
+if uploaded_file is None:
+    render_shared_report_notice('thyroid')
+
 # Input Fields with Validation
 def validate_value(key, default, min_val, max_val):
     value = st.session_state.get(key, default)
@@ -222,15 +174,14 @@ FTI = st.number_input('FTI (μg/dL)', min_value=0.0,
 if st.button('Predict Thyroid Condition', key="thy_predict_button"):
     try:
         input_data = np.array([[age, TSH, T3, T4, TT4, T4U, FTI]])
-        scaled_data = scaler.transform(input_data)
-        prediction = model.predict(scaled_data)
-        condition = encoder.inverse_transform(prediction)[0]
-        probabilities = model.predict_proba(scaled_data)[0]
+        result = pipeline.score(input_data)[0]
+        condition = result.label
+        confidence = result.top_k[0][1]
         
         st.markdown(f"""
             <div class="prediction-box {condition}">
                 <h3>{condition} Detected</h3>
-                <p>Confidence: {max(probabilities)*100:.1f}%</p>
+                <p>Confidence: {confidence*100:.1f}%</p>
                 <h3 style="margin:0; color: var(--text-color);">
                     {condition} Detected
                 </h3>
@@ -0,0 +1,212 @@
+"""Headless HTTP scoring service for the four predictor pipelines.
+
+    python score_service.py [--host 127.0.0.1] [--port 8600]
+
+Endpoints (JSON in, JSON out):
+
+    GET  /health              predictors and loaded model versions
+    GET  /ready               warm-up status per predictor; 503 until all are ready
+    GET  /metrics             micro-batching and prediction cache statistics
+    POST /predict/<name>      name: diabetes, fever, thyroid or bp
+
+A predict body is one row object, a list of rows, or ``{"rows": [...]}``.
+Row keys are the form field keys (``age``, ``hba1c``, ...) or the pipeline's
+``feature_names`` (``HbA1c (%)``), and categorical values use the same
+mappings as the pages ("Male", "Yes", "Moderate", ...)::
+
+    curl -s localhost:8600/predict/thyroid \\
+         -d '{"age": 54, "TSH": 3.1, "T3": 2.0, "T4": 100, "TT4": 110, "T4U": 1.0, "FTI": 105}'
+
+The response lists ``{"label", "probabilities"}`` per row in input order.
+Pipelines come from the process-wide registry, so each is loaded once. The
+server only uses the standard library and binds to localhost by default.
+
+Every pipeline is loaded and warmed up with a synthetic prediction before
+the server starts listening (see ``utils.warmup``).
+
+Concurrent requests to the same predictor are scored together (see
+``utils.microbatch``): ``--max-batch`` rows at most, waiting at most
+``--max-wait-ms`` after the first one; ``--max-wait-ms 0`` scores every
+request on its own.
+"""
+import argparse
+import json
+import os
+import time
+from functools import partial
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from utils.microbatch import MAX_BATCH, MAX_WAIT, MicroBatcher
+from utils.model_registry import ARTIFACTS, get_pipeline, registry
+from utils.predictors import encode_rows
+from utils.warmup import readiness, warm_up
+
+MAX_BODY_BYTES = int(os.environ.get('NEO_SERVICE_MAX_BODY', 4 * 1024 * 1024))
+
+
+def _rows(payload):
+    if isinstance(payload, dict) and 'rows' in payload:
+        payload = payload['rows']
+    if isinstance(payload, dict):
+        return [payload]
+    if isinstance(payload, list):
+        return payload
+    raise ValueError("expected a row object, a list of rows or {\"rows\": [...]}")
+
+
+def _score_batch(name, X):
+    pipeline = get_pipeline(name)
+    return pipeline.score(X), pipeline.version
+
+
+batchers = {name: MicroBatcher(partial(_score_batch, name), name=name) for name in ARTIFACTS}
+
+
+def predict(name, payload):
+    """Response body for a predict request on predictor ``name``."""
+    pipeline = get_pipeline(name)
+    rows = _rows(payload)
+    if rows:
+        scores, version = batchers[name].score(encode_rows(name, pipeline, rows))
+    else:
+        scores, version = [], pipeline.version
+    return {
+        'predictor': name,
+        'model_version': version,
+        'predictions': [{'label': s.label, 'probabilities': s.probabilities} for s in scores],
+    }
+
+
+def health():
+    return {
+        'status': 'ok',
+        'predictors': {name: (registry.info(name) or {}).get('version')
+                       for name in ARTIFACTS},
+    }
+
+
+def metrics():
+    return {
+        name: {
+            'batching': batcher.metrics.snapshot(),
+            'prediction_cache': (registry.info(name) or {}).get('prediction_cache'),
+        }
+        for name, batcher in batchers.items()
+    }
+
+
+class ScoringHandler(BaseHTTPRequestHandler):
+    server_version = 'NeoScoring/1.0'
+    protocol_version = 'HTTP/1.1'
+
+    def _send(self, status, body):
+        data = json.dumps(body).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        if self.close_connection:
+            self.send_header('Connection', 'close')
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _error(self, status, message, close=False):
+        # An unread body would be parsed as the next request on a
+        # keep-alive connection, so those errors close it
+        if close:
+            self.close_connection = True
+        self._send(status, {'error': message})
+
+    def do_GET(self):
+        path = self.path.rstrip('/')
+        if path == '/health':
+            self._send(HTTPStatus.OK, health())
+        elif path == '/ready':
+            report = readiness()
+            self._send(HTTPStatus.OK if report['ready'] else HTTPStatus.SERVICE_UNAVAILABLE,
+                       report)
+        elif path == '/metrics':
+            self._send(HTTPStatus.OK, metrics())
+        else:
+            self._error(HTTPStatus.NOT_FOUND, f"no such endpoint: {self.path}")
+
+    def do_POST(self):
+        prefix, _, name = self.path.rstrip('/').rpartition('/')
+        if prefix != '/predict' or name not in ARTIFACTS:
+            self._error(HTTPStatus.NOT_FOUND, f"no such endpoint: {self.path}; "
+                        f"use /predict/<{'|'.join(ARTIFACTS)}>", close=True)
+            return
+
+        try:
+            length = int(self.headers.get('Content-Length') or 0)
+            if length < 0:
+                raise ValueError(length)
+        except ValueError:
+            self._error(HTTPStatus.BAD_REQUEST, "invalid Content-Length", close=True)
+            return
+        if length > MAX_BODY_BYTES:
+            self._error(HTTPStatus.REQUEST_ENTITY_TOO_LARGE,
+                        f"body larger than {MAX_BODY_BYTES} bytes", close=True)
+            return
+        try:
+            payload = json.loads(self.rfile.read(length) or b'null')
+            body = predict(name, payload)
+        except ValueError as e:
+            self._error(HTTPStatus.BAD_REQUEST, str(e))
+            return
+        except Exception as e:
+            self.log_error("scoring %s failed: %r", name, e)
+            self._error(HTTPStatus.INTERNAL_SERVER_ERROR, "scoring failed")
+            return
+        self._send(HTTPStatus.OK, body)
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+
+def make_server(host='127.0.0.1', port=8600, verbose=False):
+    server = ThreadingHTTPServer((host, port), ScoringHandler)
+    server.daemon_threads = True
+    server.verbose = verbose
+    return server
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve the predictor pipelines over local HTTP.")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8600)
+    parser.add_argument('--max-batch', type=int, default=MAX_BATCH,
+                        help="most rows scored in one batched call")
+    parser.add_argument('--max-wait-ms', type=float, default=MAX_WAIT * 1000,
+                        help="longest a request waits for others to batch with (0: no batching)")
+    parser.add_argument('--verbose', action='store_true', help="log every request")
+    args = parser.parse_args(argv)
+
+    for batcher in batchers.values():
+        batcher.max_batch = max(1, args.max_batch)
+        batcher.max_wait = max(0.0, args.max_wait_ms / 1000)
+
+    start = time.perf_counter()
+    report = warm_up()
+    for name, status in report['pipelines'].items():
+        if status['ready']:
+            print(f"🔥 {name}: v{status['version']} loaded in {status['load_seconds']:.2f}s, "
+                  f"{status['latency_ms']:.2f} ms per row")
+        else:
+            print(f"⚠️ {name} not ready: {status['error']}")
+    print(f"📦 Warmed up {sum(s['ready'] for s in report['pipelines'].values())}/{len(ARTIFACTS)} "
+          f"pipelines in {time.perf_counter() - start:.2f}s")
+
+    server = make_server(args.host, args.port, args.verbose)
+    print(f"🚀 Scoring service on http://{args.host}:{server.server_port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == '__main__':
+    main()
@@ -7,6 +7,8 @@ from sklearn.ensemble import RandomForestClassifier
 from sklearn.preprocessing import StandardScaler, LabelEncoder
 from sklearn.metrics import accuracy_score
 
+from utils.artifact import export_artifact
+
 # 1️⃣ Load and prepare data
 try:
     dataset_path = os.path.join("datasets", "blood_pressure.csv")
@@ -72,6 +74,9 @@ try:
     joblib.dump(pipeline, model_path)
     print(f"✅ Full pipeline saved to: {model_path}")
     print("Saved components:", list(pipeline.keys()))
+
+    artifact_path = export_artifact(pipeline, os.path.join(models_folder, "bp_model"))
+    print(f"✅ Memory-mapped artifact saved to: {artifact_path}")
 except Exception as e:
     print(f"⚠️ Error saving pipeline: {e}")
     traceback.print_exc()
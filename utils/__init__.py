@@ -0,0 +1 @@
+"""Shared helpers for the NEO Health AI predictor pages and training scripts."""
@@ -0,0 +1,160 @@
+"""Memory-mappable artifact format for the predictor pipelines.
+
+Each pipeline is written next to its ``.pkl`` as a directory of flat ``.npy``
+arrays plus a small ``meta.json``::
+
+    models/diabetes_model/
+        meta.json            feature/class names, mappings, array checksums
+        children_left.npy    int32   (n_nodes,)   global child indices, -1 at leaves
+        children_right.npy   int32   (n_nodes,)
+        feature.npy          int32   (n_nodes,)
+        threshold.npy        float64 (n_nodes,)
+        missing_go_to_left.npy  bool (n_nodes,)   branch taken by NaN inputs
+        value.npy            float64 (n_nodes, n_classes)  leaf class probabilities
+        roots.npy            int64   (n_trees,)   first node of every tree
+        scaler_mean.npy      float64 (n_features,)
+        scaler_scale.npy     float64 (n_features,)
+
+Arrays are opened with ``np.load(..., mmap_mode='r')``, so every server
+process on a box shares one page-cache copy and loading does no unpickling.
+Files are replaced atomically (write + rename), which keeps readers that
+still map the previous version safe.
+
+By default the StandardScaler is folded into ``threshold.npy`` (see
+``FlatForest.fold_scaler``) and ``meta.json`` records ``scaler_folded``, so
+inference runs on raw inputs. The scaler arrays are still written, and the
+original ``.pkl`` is left untouched for verification.
+
+Run ``python -m utils.artifact [--keep-scaler] [diabetes fever thyroid bp]``
+to convert the existing ``models/*.pkl`` files.
+"""
+import hashlib
+import json
+import os
+import sys
+
+import numpy as np
+
+from utils.forest import FlatForest, NODE_ARRAYS
+
+FORMAT_VERSION = 3
+META_FILE = 'meta.json'
+
+
+class FlatScaler:
+    """``StandardScaler.transform`` over stored mean/scale arrays."""
+
+    def __init__(self, mean, scale):
+        self.mean_ = mean
+        self.scale_ = scale
+
+    def transform(self, X):
+        return (np.asarray(X, dtype=np.float64) - self.mean_) / self.scale_
+
+
+class FlatEncoder:
+    """``LabelEncoder.inverse_transform`` over the stored class names."""
+
+    def __init__(self, classes):
+        self.classes_ = np.asarray(classes, dtype=object)
+
+    def inverse_transform(self, y):
+        return self.classes_[np.asarray(y, dtype=np.intp)]
+
+
+def file_checksum(path, chunk_size=1 << 20):
+    """SHA-256 hex digest of a file, read in chunks."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as fh:
+        for chunk in iter(lambda: fh.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _atomic_write(path, write):
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'wb') as fh:
+        write(fh)
+    os.replace(tmp_path, path)
+
+
+def export_artifact(pipeline, out_dir, fold_scaler=True):
+    """Write ``pipeline`` (as saved by a train_*.py script) to ``out_dir``."""
+    os.makedirs(out_dir, exist_ok=True)
+    model = pipeline['model']
+    forest = model if isinstance(model, FlatForest) else FlatForest.from_estimator(model)
+    scaler = pipeline['scaler']
+    if fold_scaler:
+        forest = forest.fold_scaler(scaler.mean_, scaler.scale_)
+
+    arrays = forest.arrays()
+    arrays['scaler_mean'] = np.asarray(scaler.mean_, dtype=np.float64)
+    arrays['scaler_scale'] = np.asarray(scaler.scale_, dtype=np.float64)
+
+    checksums = {}
+    for key, array in arrays.items():
+        path = os.path.join(out_dir, f"{key}.npy")
+        _atomic_write(path, lambda fh, a=array: np.save(fh, np.ascontiguousarray(a)))
+        checksums[key] = file_checksum(path)
+
+    meta = {
+        'format_version': FORMAT_VERSION,
+        'feature_names': list(pipeline['feature_names']),
+        'class_names': [str(c) for c in pipeline['encoder'].classes_],
+        'model_classes': [int(c) for c in forest.classes_],
+        'scaler_folded': bool(forest.raw_input),
+        'mappings': {key: dict(value) for key, value in pipeline.items()
+                     if key.endswith('_mapping')},
+        'checksums': checksums,
+    }
+    # meta.json goes last: its presence and checksum mark a complete artifact
+    _atomic_write(os.path.join(out_dir, META_FILE),
+                  lambda fh: fh.write(json.dumps(meta, indent=2).encode('utf-8')))
+    return out_dir
+
+
+def load_artifact(path, mmap_mode='r', verify=False):
+    """Rebuild a pipeline dict from a flat artifact directory.
+
+    The returned dict has the same keys the pages use from the pickled
+    pipeline (``model``, ``scaler``, ``encoder``, the ``*_mapping`` dicts,
+    ``feature_names`` and ``class_names``).
+    """
+    with open(os.path.join(path, META_FILE), encoding='utf-8') as fh:
+        meta = json.load(fh)
+    if meta.get('format_version') != FORMAT_VERSION:
+        raise ValueError(f"Unsupported artifact format {meta.get('format_version')!r} in {path}")
+
+    arrays = {}
+    for key, checksum in meta['checksums'].items():
+        array_path = os.path.join(path, f"{key}.npy")
+        if verify and file_checksum(array_path) != checksum:
+            raise ValueError(f"Checksum mismatch for {array_path}")
+        arrays[key] = np.load(array_path, mmap_mode=mmap_mode)
+
+    forest = FlatForest(*(arrays[key] for key in NODE_ARRAYS),
+                        roots=arrays['roots'], classes=meta['model_classes'],
+                        raw_input=meta['scaler_folded'])
+    pipeline = {
+        'model': forest,
+        'scaler': FlatScaler(arrays['scaler_mean'], arrays['scaler_scale']),
+        'encoder': FlatEncoder(meta['class_names']),
+        'feature_names': meta['feature_names'],
+        'class_names': meta['class_names'],
+    }
+    pipeline.update(meta['mappings'])
+    return pipeline
+
+
+if __name__ == '__main__':
+    import joblib
+    from utils.model_registry import registry
+
+    args = sys.argv[1:]
+    fold_scaler = '--keep-scaler' not in args
+    names = [arg for arg in args if not arg.startswith('--')]
+    for name in names or registry.artifacts:
+        source = registry.path(name)
+        out_dir = export_artifact(joblib.load(source), registry.flat_path(name),
+                                  fold_scaler=fold_scaler)
+        print(f"✅ {source} -> {out_dir}")
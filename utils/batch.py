@@ -0,0 +1,27 @@
+"""Batch scoring of every row in an uploaded CSV."""
+import streamlit as st
+
+from utils.predictors import missing_fields, score_frame
+
+
+def render_batch_results(name, pipeline, df, matched, key):
+    """Score a multi-row CSV and show a summary plus a results download."""
+    missing = missing_fields(name, matched)
+    if missing:
+        st.warning(f"Batch scoring needs columns for: {', '.join(missing)}")
+        return
+
+    results = score_frame(name, pipeline, df, matched)
+    scored = int(results['Prediction'].notna().sum())
+    st.markdown(f"**Batch results:** {scored} of {len(results)} patients scored")
+    if scored < len(results):
+        st.caption("Rows with missing or unreadable values were skipped.")
+    summary = results['Prediction'].value_counts().rename_axis('Prediction')
+    st.dataframe(summary.reset_index(name='Patients'), hide_index=True)
+    st.download_button(
+        label="Download Batch Results",
+        data=results.to_csv(index=False).encode('utf-8'),
+        file_name=f"{name}_predictions.csv",
+        mime="text/csv",
+        key=key
+    )
@@ -0,0 +1,98 @@
+"""Content-addressed cache for report extraction results.
+
+Streamlit reruns the page script on every widget interaction while the
+uploaded file stays set, so without a cache the same report would be parsed
+and OCR'd again on each click. Entries are keyed by a SHA-256 of the upload
+plus the predictor and extractor version. A bounded in-memory LRU is shared
+by every session in the process; setting ``NEO_EXTRACTION_CACHE_DIR`` adds an
+on-disk tier that survives restarts and is shared between processes.
+"""
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+
+DEFAULT_MAX_ENTRIES = 256
+
+
+class ExtractionCache:
+    """Two-tier (memory LRU + optional JSON files) cache of extracted fields."""
+
+    def __init__(self, max_entries=DEFAULT_MAX_ENTRIES, disk_dir=None):
+        self.max_entries = max_entries
+        self.disk_dir = disk_dir
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        if disk_dir:
+            os.makedirs(disk_dir, exist_ok=True)
+
+    @staticmethod
+    def key(data, *parts):
+        """Cache key for upload bytes and any extra discriminators."""
+        digest = hashlib.sha256(data)
+        for part in parts:
+            digest.update(b'\0' + str(part).encode('utf-8'))
+        return digest.hexdigest()
+
+    def _disk_path(self, key):
+        return os.path.join(self.disk_dir, f"{key}.json")
+
+    def get(self, key):
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return dict(self._entries[key])
+
+        if self.disk_dir:
+            try:
+                with open(self._disk_path(key), encoding='utf-8') as fh:
+                    value = json.load(fh)
+            except (OSError, ValueError):
+                value = None
+            if value is not None:
+                self._remember(key, value)
+                with self._lock:
+                    self.hits += 1
+                return dict(value)
+
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def put(self, key, value):
+        self._remember(key, value)
+        if self.disk_dir:
+            path = self._disk_path(key)
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as fh:
+                json.dump(value, fh)
+            os.replace(tmp_path, path)
+
+    def _remember(self, key, value):
+        with self._lock:
+            self._entries[key] = dict(value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def get_or_compute(self, key, compute):
+        """Cached value for ``key``, computing and storing it on a miss."""
+        value = self.get(key)
+        if value is None:
+            value = compute()
+            self.put(key, value)
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+extraction_cache = ExtractionCache(
+    max_entries=int(os.environ.get('NEO_EXTRACTION_CACHE_SIZE', DEFAULT_MAX_ENTRIES)),
+    disk_dir=os.environ.get('NEO_EXTRACTION_CACHE_DIR') or None,
+)
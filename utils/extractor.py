@@ -0,0 +1,255 @@
+"""Single-pass extraction of every known field from report text.
+
+All field labels of all four predictors (Age, TSH, HbA1c, Systolic, Heart
+Rate, ...) are compiled into one alternation, longest label first. The text
+is lower-cased once and scanned once with it (a scan for some fields only
+alternates over their labels); a case-sensitive alternation of
+plain lowercase labels is several times faster in ``re`` than the same
+pattern with ``IGNORECASE``. At the end of each label hit only the fields
+that use that label are tried, with a value pattern anchored at that
+position. Every quantifier in the value patterns is bounded, so each hit
+costs constant work and a scan is linear in the length of the text, however
+garbled the OCR output is.
+
+Values are returned as the raw matched strings; ``utils.predictors`` turns
+them into form values.
+"""
+import re
+import string
+from collections import namedtuple
+
+# field: field key; value/unit: matched text ('' if no unit);
+# offset/end: span from the label to the end of the value in the text
+FieldMatch = namedtuple('FieldMatch', ['field', 'value', 'unit', 'offset', 'end'])
+
+_INT = r"(\d{1,4})(?!\d)"
+_DECIMAL = r"(\d{1,6}(?:\.\d{1,6})?)(?!\d)"
+_YES_NO = r"(Yes|No)\b"
+_SEVERITY = r"(None|Mild|Moderate|Severe)\b"
+
+# Separator allowed between a label and its value (":", " - ", newlines, ...)
+_SEPARATOR = r"\W{0,32}"
+
+# field -> (labels, value pattern with one group, units). A space in a
+# label matches up to three whitespace characters, or none.
+FIELD_SPECS = {
+    'age': (['Age'], _INT, ['years', 'yrs']),
+    'gender': (['Gender', 'Sex'], r"(Male|Female|M|F)", []),
+    'bmi': (['BMI', 'Body Mass Index'], _DECIMAL, []),
+    'glucose': (['Glucose', 'GLU'], _DECIMAL, ['mg/dL', 'mmol/L']),
+    'hba1c': (['HbA1c', 'A1C'], _DECIMAL, ['%']),
+    'fasting': (['Fasting', 'FBS'], _DECIMAL, ['mg/dL', 'mmol/L']),
+    'post_meal': (['Post Meal', 'Postprandial', 'PPBS'], _DECIMAL, ['mg/dL', 'mmol/L']),
+    'family_history': (['Family History'], r"(Yes|No|Positive|Negative)", []),
+    'temp': (['Temp', 'Temperature'], _DECIMAL, ['°C']),
+    'duration': (['Duration', 'Days'], _INT, ['days']),
+    'heart_rate': (['Heart Rate', 'HR'], _INT, ['bpm']),
+    'severity': (['Severity'], _SEVERITY, []),
+    'dehydration': (['Dehydration'], _SEVERITY, []),
+    'headache': (['Headache'], _YES_NO, []),
+    'muscle_pain': (['Muscle Pain', 'Myalgia'], _YES_NO, []),
+    'fatigue': (['Fatigue'], _YES_NO, []),
+    'chills': (['Chills'], _YES_NO, []),
+    'TSH': (['TSH'], _DECIMAL, ['mIU/L']),
+    'T3': (['T3', 'Triiodothyronine'], _DECIMAL, ['pg/mL']),
+    'T4': (['T4', 'Thyroxine'], _DECIMAL, ['μg/dL']),
+    'TT4': (['Total T4', 'TT4'], _DECIMAL, ['μg/dL']),
+    'T4U': (['T4 Uptake', 'T4U'], _DECIMAL, ['%']),
+    'FTI': (['FTI', 'Free Thyroid Index'], _DECIMAL, ['μg/dL']),
+    'weight': (['Weight', 'WT'], _DECIMAL, ['kg']),
+    'height': (['Height', 'HT'], _DECIMAL, ['cm']),
+    'systolic': (['Systolic', 'SBP'], _DECIMAL, ['mmHg']),
+    'diastolic': (['Diastolic', 'DBP'], _DECIMAL, ['mmHg']),
+    'cholesterol': (['Cholesterol', 'CHOL'], _DECIMAL, ['mg/dL']),
+    'pulse': (['Pulse', 'HR'], _DECIMAL, ['bpm']),
+}
+
+# Characters lower-cased at a time while scanning: the first block is small
+# because report headers usually hold every field (lower-casing text with
+# symbols such as μ or ° costs about as much as scanning it), later blocks grow
+_FIRST_BLOCK = 512
+_MAX_BLOCK = 65536
+
+_ASCII_LOWER = str.maketrans(string.ascii_uppercase, string.ascii_lowercase)
+
+# A label must not follow one of these (checked outside the regex: a leading
+# lookbehind stops ``re`` from skipping ahead to a label's first character)
+_WORD_CHARS = frozenset(string.ascii_lowercase + string.digits)
+
+
+def _fold(text):
+    folded = text.lower()
+    if len(folded) != len(text):
+        # A few non-ASCII characters change length when lower-cased; fold
+        # ASCII only so offsets still line up
+        folded = text.translate(_ASCII_LOWER)
+    return folded
+
+
+def _label_key(label):
+    return "".join(label.lower().split())
+
+
+def _overlaps(label, other):
+    """Whether ``other``, longer or equal, can match where ``label`` starts."""
+    starts = [0] + [i + 1 for i, char in enumerate(other) if not char.isalnum()]
+    return any(other[i:].startswith(label) or label.startswith(other[i:]) for i in starts)
+
+
+def _compile_labels(labels):
+    # Longest first, so "total t4" wins over "t4" and "temperature"
+    # over "temp"
+    alternation = "|".join(r"\s{0,3}".join(map(re.escape, label.split()))
+                           for label in sorted(labels, key=lambda label: (-len(label), label)))
+    return re.compile(rf"(?:{alternation})(?![a-z])")
+
+
+def _iter_labels(pattern, folded, pos=0):
+    """Label matches in ``folded`` from ``pos`` that do not start mid-word."""
+    search = pattern.search
+    label = search(folded, pos)
+    while label is not None:
+        start = label.start()
+        if start and folded[start - 1] in _WORD_CHARS:
+            label = search(folded, start + 1)
+        else:
+            yield label
+            label = search(folded, label.end())
+
+
+class FieldExtractor:
+    """Compiled matcher for a set of field specs."""
+
+    def __init__(self, specs=FIELD_SPECS):
+        # Label (case and space folded) -> fields that use it, so a label
+        # shared by several fields (HR: heart_rate and pulse) is matched once
+        self._label_fields = {}
+        for field, (labels, _, _) in specs.items():
+            for label in labels:
+                self._label_fields.setdefault(_label_key(label), []).append(field)
+
+        labels = frozenset(label.lower() for spec in specs.values() for label in spec[0])
+        # Hits are usually spelled like the label; those skip _label_key
+        self._spellings = {label: _label_key(label) for label in labels}
+        self._labels = _compile_labels(labels)
+        # Longest text a label can match (each space may match three)
+        self._max_label = max(len(label) + 2 * label.count(" ") for label in labels)
+
+        # Field -> its labels plus the longer labels that would take their
+        # place in the full alternation ("total t4" and "t4 uptake" for T4),
+        # so a scan for a few fields only alternates over those labels and
+        # still matches exactly where the full scan does
+        self._field_labels = {}
+        for field, (field_labels, _, _) in specs.items():
+            own = {label.lower() for label in field_labels}
+            self._field_labels[field] = frozenset(
+                own | {other for other in labels for label in own
+                       if len(other) >= len(label) and _overlaps(label, other)})
+        # Field set -> (label pattern, targets); bounded, field subsets are few
+        self._scans = {}
+
+        self._values = {}
+        for field, (_, value, units) in specs.items():
+            unit = "|".join(re.escape(u) for u in units)
+            unit = rf"(?:\s{{0,3}}({unit}))?" if units else "()"
+            self._values[field] = re.compile(_SEPARATOR + value + unit, re.IGNORECASE)
+
+    def finditer(self, text, fields=None):
+        """Yield a ``FieldMatch`` for every labelled value in ``text``.
+
+        ``fields`` restricts the search to those field keys, and the scan
+        only looks for their labels. The text is lower-cased one block at a
+        time, so a caller that stops early (see ``extract``) never pays for
+        folding the rest of a long document.
+        """
+        labels, targets = self._scan(None if fields is None else frozenset(fields))
+        search = labels.search
+        pos = 0
+        block = _FIRST_BLOCK
+        while pos < len(text):
+            # Labels must start inside [pos, block_end); the slice adds one
+            # character before for the word-start check and enough after for
+            # the longest label plus the lookahead
+            block_end = min(len(text), pos + block)
+            base = max(pos - 1, 0)
+            folded = _fold(text[base:block_end + self._max_label + 1])
+            label = search(folded, pos - base)
+            while label is not None:
+                start = label.start()
+                if start and folded[start - 1] in _WORD_CHARS:
+                    label = search(folded, start + 1)
+                    continue
+                if base + start >= block_end:
+                    break
+                end = label.end()
+                pos = base + end
+                hit = label.group()
+                tried = targets.get(hit)
+                if tried is None:
+                    tried = targets[_label_key(hit)]
+                for field, value_pattern in tried:
+                    value = value_pattern.match(text, pos)
+                    if value:
+                        # groups: value and unit, '' if no unit matched
+                        yield FieldMatch(field, *value.groups(''), base + start, value.end())
+                label = search(folded, end)
+            pos = max(pos, block_end)
+            block = min(2 * block, _MAX_BLOCK)
+
+    def _scan(self, fields):
+        """Label pattern for ``fields`` (all if None) and, per label hit as
+        spelled or by ``_label_key``, the (field, value pattern) pairs to try."""
+        scan = self._scans.get(fields)
+        if scan is None:
+            if fields is None:
+                labels = self._labels
+            else:
+                labels = _compile_labels(frozenset().union(
+                    *(self._field_labels[field] for field in fields)))
+            targets = {}
+            for key, key_fields in self._label_fields.items():
+                targets[key] = tuple((field, self._values[field]) for field in key_fields
+                                     if fields is None or field in fields)
+            for label, key in self._spellings.items():
+                targets[label] = targets[key]
+            scan = labels, targets
+            if len(self._scans) < 1024:
+                self._scans[fields] = scan
+        return scan
+
+    def labelled_fields(self, text):
+        """Fields with a label somewhere in ``text``, with or without a value."""
+        return {field for label in _iter_labels(self._labels, _fold(text))
+                for field in self._label_fields[_label_key(label.group())]}
+
+    def match_pair(self, key, value, fields=None):
+        """``FieldMatch`` for a key/value pair such as a two-column table row.
+
+        The first known label in ``key`` picks the field and ``value`` is
+        parsed with that field's value pattern. ``None`` if either fails.
+        """
+        for label in _iter_labels(self._labels, _fold(key)):
+            for field in self._label_fields[_label_key(label.group())]:
+                if fields is not None and field not in fields:
+                    continue
+                match = self._values[field].match(value)
+                if match:
+                    return FieldMatch(field, match.group(1), match.group(2) or '', 0, match.end())
+        return None
+
+    def extract(self, text, fields=None):
+        """First ``FieldMatch`` of each field in ``text``, keyed by field.
+
+        Stops scanning as soon as every requested field has been found.
+        """
+        wanted = set(self._values if fields is None else fields)
+        found = {}
+        for match in self.finditer(text, wanted):
+            if match.field not in found:
+                found[match.field] = match
+                if len(found) == len(wanted):
+                    break
+        return found
+
+
+extractor = FieldExtractor()
@@ -0,0 +1,241 @@
+"""Vectorized RandomForest inference over flat, contiguous node arrays.
+
+All trees of a fitted ``RandomForestClassifier`` are packed into one set of
+node arrays (children, split feature, threshold, NaN direction, leaf class
+probabilities), with child indices rewritten to be global. The arrays can
+come straight from an estimator or from a memory-mapped artifact (see
+``utils.artifact``), so a ``FlatForest`` never needs sklearn at prediction
+time. ``predict_proba`` matches sklearn's bit for bit, including after the
+pipeline's StandardScaler has been folded into the thresholds.
+
+Run ``python -m utils.forest`` to check that claim on the bundled datasets.
+"""
+import numpy as np
+
+TREE_LEAF = -1
+_SIGN_BIT = np.int64(-2 ** 63)
+
+# Names of the per-node arrays, in the order they are stored
+NODE_ARRAYS = ('children_left', 'children_right', 'feature', 'threshold',
+               'missing_go_to_left', 'value')
+
+
+class FlatForest:
+    """Predict-capable stand-in for a fitted ``RandomForestClassifier``."""
+
+    def __init__(self, children_left, children_right, feature, threshold,
+                 missing_go_to_left, value, roots, classes, raw_input=False):
+        self.children_left = children_left
+        self.children_right = children_right
+        self.feature = feature
+        self.threshold = threshold
+        self.missing_go_to_left = missing_go_to_left
+        self.value = value
+        self.roots = roots
+        self.classes_ = np.asarray(classes)
+        self.n_classes_ = len(self.classes_)
+        self.n_estimators = len(roots)
+        # True once the scaler has been folded into the thresholds, i.e. the
+        # forest takes raw feature values (see fold_scaler)
+        self.raw_input = raw_input
+
+    @classmethod
+    def from_estimator(cls, model):
+        """Pack every tree of a fitted sklearn forest into flat arrays."""
+        lefts, rights, features, thresholds, missing, values, roots = [], [], [], [], [], [], []
+        offset = 0
+        for estimator in model.estimators_:
+            tree = estimator.tree_
+            left = tree.children_left.astype(np.int32)
+            right = tree.children_right.astype(np.int32)
+            is_split = left != TREE_LEAF
+            left[is_split] += offset
+            right[is_split] += offset
+
+            # sklearn >= 1.4 stores leaf class fractions and returns them as
+            # is; older versions store weighted counts and normalise them in
+            # DecisionTreeClassifier.predict_proba
+            proba = tree.value[:, 0, :model.n_classes_].astype(np.float64)
+            normalizer = proba.sum(axis=1)[:, np.newaxis]
+            if not np.allclose(normalizer, 1.0):
+                normalizer[normalizer == 0.0] = 1.0
+                proba /= normalizer
+
+            lefts.append(left)
+            rights.append(right)
+            features.append(tree.feature.astype(np.int32))
+            thresholds.append(tree.threshold.astype(np.float64))
+            # Trees fitted before sklearn 1.3 send NaN right (NaN <= t is False)
+            missing.append(getattr(tree, 'missing_go_to_left',
+                                   np.zeros(tree.node_count)).astype(bool))
+            values.append(proba)
+            roots.append(offset)
+            offset += tree.node_count
+
+        return cls(
+            np.concatenate(lefts), np.concatenate(rights),
+            np.concatenate(features), np.concatenate(thresholds),
+            np.concatenate(missing), np.concatenate(values),
+            np.asarray(roots, dtype=np.int64), model.classes_,
+        )
+
+    def arrays(self):
+        """The node arrays keyed by name, plus the tree root offsets."""
+        arrays = {name: getattr(self, name) for name in NODE_ARRAYS}
+        arrays['roots'] = self.roots
+        return arrays
+
+    def apply(self, X):
+        """Global leaf index reached by every row in every tree.
+
+        All trees are walked together for the whole batch: each step
+        advances every (tree, row) pair that has not reached a leaf yet, so
+        the Python-level loop runs once per tree *level* instead of once per
+        tree and row. Returns an array of shape ``(n_trees, n_rows)``.
+        """
+        # sklearn evaluates trees on float32 input; do the same so splits
+        # agree. Folded thresholds are exact for the float64 raw values.
+        X = np.asarray(X, dtype=np.float64 if self.raw_input else np.float32)
+        if X.ndim == 1:
+            X = X.reshape(1, -1)
+        n_rows, n_features = X.shape
+        flat_X = X.ravel()
+        has_nan = bool(np.isnan(flat_X).any())
+        nodes = np.repeat(self.roots.astype(np.intp), n_rows)
+        # Offset of each (tree, row) pair's row in the flattened input
+        row_offsets = np.tile(np.arange(0, n_rows * n_features, n_features,
+                                        dtype=np.intp), self.n_estimators)
+
+        active = np.flatnonzero(self.children_left.take(nodes) != TREE_LEAF)
+        while active.size:
+            current = nodes.take(active)
+            x = flat_X.take(row_offsets.take(active) + self.feature.take(current))
+            go_left = x <= self.threshold.take(current)
+            if has_nan:
+                missing = np.isnan(x)
+                go_left[missing] = self.missing_go_to_left.take(current[missing])
+            current = np.where(go_left, self.children_left.take(current),
+                               self.children_right.take(current))
+            nodes[active] = current
+            active = active[self.children_left.take(current) != TREE_LEAF]
+        return nodes.reshape(self.n_estimators, n_rows)
+
+    def predict_proba(self, X):
+        leaves = self.apply(X)
+        proba = np.zeros((leaves.shape[1], self.n_classes_), dtype=np.float64)
+        # Accumulate tree by tree, in order, exactly like sklearn's forest so
+        # the floating point sums are bit-for-bit identical
+        for tree_leaves in leaves:
+            proba += self.value[tree_leaves]
+        proba /= self.n_estimators
+        return proba
+
+    def predict(self, X):
+        return self.classes_.take(np.argmax(self.predict_proba(X), axis=1), axis=0)
+
+    def fold_scaler(self, mean, scale):
+        """Copy of this forest that takes raw, unscaled feature values.
+
+        Splits compare ``float32((x - mean) / scale) <= t``. That is monotone
+        in ``x``, so each split is equivalent to ``x <= T`` for the largest
+        float64 ``T`` that still goes left. ``T`` is found by bisecting the
+        float64 bit patterns, which makes the folded forest take exactly the
+        same branches as the original for every input, not just approximately.
+        """
+        if self.raw_input:
+            return self
+        mean = np.asarray(mean, dtype=np.float64)
+        scale = np.asarray(scale, dtype=np.float64)
+
+        split = np.flatnonzero(self.children_left != TREE_LEAF)
+        feature = self.feature[split]
+        m, s, t = mean[feature], scale[feature], self.threshold[split]
+
+        def goes_left(x):
+            with np.errstate(over='ignore', invalid='ignore'):
+                return ((x - m) / s).astype(np.float32) <= t
+
+        lo = _ordered_key(np.full(split.size, -np.inf))
+        hi = _ordered_key(np.full(split.size, np.inf))
+        while True:
+            pending = hi > lo + 1
+            if not pending.any():
+                break
+            mid = (lo >> 1) + (hi >> 1) + (lo & hi & 1)
+            left = goes_left(_from_ordered_key(mid))
+            lo = np.where(pending & left, mid, lo)
+            hi = np.where(pending & ~left, mid, hi)
+
+        threshold = np.array(self.threshold, dtype=np.float64)
+        threshold[split] = _from_ordered_key(lo)
+        return FlatForest(self.children_left, self.children_right, self.feature,
+                          threshold, self.missing_go_to_left, self.value,
+                          self.roots, self.classes_, raw_input=True)
+
+
+def _ordered_key(x):
+    """Map float64 values to int64 keys that sort in the same order."""
+    bits = np.asarray(x, dtype=np.float64).view(np.int64)
+    return np.where(bits < 0, _SIGN_BIT - bits, bits)
+
+
+def _from_ordered_key(key):
+    return np.where(key < 0, _SIGN_BIT - key, key).view(np.float64)
+
+
+def compile_pipeline(pipeline, fold_scaler=True):
+    """Copy of a saved pipeline dict with ``model`` swapped for a FlatForest.
+
+    With ``fold_scaler`` the pipeline's StandardScaler is folded into the
+    tree thresholds, so prediction needs no ``scaler.transform``. The fitted
+    sklearn estimator stays available under ``estimator``.
+    """
+    compiled = dict(pipeline)
+    model = pipeline['model']
+    if not isinstance(model, FlatForest):
+        model = FlatForest.from_estimator(model)
+        compiled['estimator'] = pipeline['model']
+    if fold_scaler:
+        scaler = pipeline['scaler']
+        model = model.fold_scaler(scaler.mean_, scaler.scale_)
+    compiled['model'] = model
+    return compiled
+
+
+if __name__ == '__main__':
+    import os
+
+    import joblib
+    import pandas as pd
+
+    from utils.model_registry import PROJECT_ROOT, registry
+
+    datasets = {
+        'diabetes': ('diabetes.csv', 'Diabetes Type'),
+        'fever': ('fever_types.csv', 'Condition'),
+        'thyroid': ('thyroid.csv', 'Condition'),
+        'bp': ('blood_pressure.csv', 'Condition'),
+    }
+    for name, (csv_name, target) in datasets.items():
+        pipeline = joblib.load(registry.path(name))
+        df = pd.read_csv(os.path.join(PROJECT_ROOT, 'datasets', csv_name))
+        X = df.drop(columns=[target])
+
+        # Same categorical encoding as the train_*.py scripts
+        categories = {'Yes': 1, 'No': 0}
+        for key, mapping in pipeline.items():
+            if key.endswith('_mapping'):
+                categories.update(mapping)
+        for column in X.select_dtypes(exclude='number').columns:
+            X[column] = X[column].map(categories)
+
+        raw = X.to_numpy(dtype=np.float64)
+        scaled = pipeline['scaler'].transform(raw)
+        expected = pipeline['model'].predict_proba(scaled)
+        checks = {
+            'flat': compile_pipeline(pipeline, fold_scaler=False)['model'].predict_proba(scaled),
+            'folded scaler': compile_pipeline(pipeline)['model'].predict_proba(raw),
+        }
+        for label, actual in checks.items():
+            status = "✅ identical" if np.array_equal(expected, actual) else "⚠️ MISMATCH"
+            print(f"{status}: {name} {label} ({len(X)} rows)")
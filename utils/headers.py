@@ -0,0 +1,150 @@
+"""Resolve CSV column headers to predictor fields.
+
+Headers are normalised (case, ``_``/``-``/``.`` separators and bracketed
+units such as ``(mg/dL)`` removed) and looked up in a precomputed alias
+index first. Other bracketed text is kept: ``Glucose (fasting)`` is not
+``Glucose``. Only the headers left over after that exact pass are scored
+against the aliases of the fields still unmatched with ``thefuzz``. The
+scorer compares whole headers, so it forgives typos (``Cholestrol``) but not
+extra words (``HDL Cholesterol``, ``Age Group``), and a header scoring the
+same for two fields is left unmatched. The best pairs above ``FUZZY_CUTOFF``
+win. A header's unit (``header_unit``) must be one its field accepts, so
+``Weight (st)`` or ``T3 (pmol/L)`` stay unmatched rather than being read in
+the wrong unit; converting accepted units is up to the caller. Resolutions
+are cached per header signature, so reruns and chunked reads of the same
+file cost one dict lookup.
+"""
+import re
+import threading
+from collections import OrderedDict
+
+# Minimum token-sort similarity (0-100) for a fuzzy header match
+FUZZY_CUTOFF = 90
+
+# Aliases shorter than this ('hr', 'wt', ...) only ever match exactly
+MIN_FUZZY_ALIAS = 3
+
+# Headers longer than this are never fuzzy-scored
+MAX_FUZZY_HEADER = 64
+
+# Bracketed text recognised as a unit and dropped from headers; anything
+# else in brackets is kept
+UNITS = {
+    '%', 'mg/dl', 'mmol/l', 'g/dl', 'ng/dl', 'pg/ml', 'pmol/l', 'nmol/l', 'ug/dl',
+    'µg/dl', 'miu/l', 'uiu/ml', 'µiu/ml', 'mu/l', 'mmhg', 'kg', 'lb', 'lbs',
+    'cm', 'm', 'in', 'kg/m2', 'kg/m²', 'bpm', '/min', 'beats/min', 'c', '°c',
+    'f', '°f', 'days', 'day', 'years', 'yrs', 'yr',
+}
+
+_BRACKETED = re.compile(r"[(\[]([^)\]]*)[)\]]")
+_SEPARATORS = re.compile(r"[\s_\-./]+")
+
+
+def _strip_unit(match):
+    return " " if match.group(1).strip() in UNITS else f" {match.group(1)} "
+
+
+def header_unit(header):
+    """Lowercase unit written in brackets in ``header``, or '' if none."""
+    for match in _BRACKETED.finditer(str(header).lower()):
+        if match.group(1).strip() in UNITS:
+            return match.group(1).strip()
+    return ''
+
+
+def normalize_header(header):
+    """Lowercase header text without units or punctuation separators."""
+    header = _BRACKETED.sub(_strip_unit, str(header).lower())
+    return " ".join(_SEPARATORS.sub(" ", header).split())
+
+
+class HeaderResolver:
+    """Alias index plus fuzzy fallback for one ``{name: {field: aliases}}`` table.
+
+    ``field_units`` maps each field to the units its header may carry; a
+    header with any other recognised unit is not matched to that field.
+    Without it every unit is accepted.
+    """
+
+    def __init__(self, column_maps, field_units=None, cache_size=256):
+        self._field_units = field_units
+        self._exact = {}
+        self._fuzzy = {}
+        for name, fields in column_maps.items():
+            exact, fuzzy = {}, {}
+            for field, aliases in fields.items():
+                for alias in [field, *aliases]:
+                    alias = normalize_header(alias)
+                    exact.setdefault(alias, field)
+                    exact.setdefault(alias.replace(" ", ""), field)
+                    if len(alias) >= MIN_FUZZY_ALIAS:
+                        fuzzy.setdefault(alias, field)
+            self._exact[name] = exact
+            self._fuzzy[name] = fuzzy
+        self._cache = OrderedDict()
+        self._cache_size = cache_size
+        self._lock = threading.Lock()
+
+    def resolve(self, name, columns):
+        """Map field keys to the matching entries of ``columns``."""
+        columns = list(columns)
+        signature = (name, tuple(str(col) for col in columns))
+        with self._lock:
+            positions = self._cache.get(signature)
+            if positions is not None:
+                self._cache.move_to_end(signature)
+        if positions is None:
+            positions = self._resolve_positions(name, signature[1])
+            with self._lock:
+                self._cache[signature] = positions
+                while len(self._cache) > self._cache_size:
+                    self._cache.popitem(last=False)
+        return {field: columns[i] for field, i in positions.items()}
+
+    def _accepts(self, field, unit):
+        return not unit or self._field_units is None or unit in self._field_units.get(field, ())
+
+    def _resolve_positions(self, name, headers):
+        exact = self._exact[name]
+        positions = {}
+        leftovers = []
+        for i, header in enumerate(headers):
+            normalized = normalize_header(header)
+            unit = header_unit(header)
+            field = exact.get(normalized) or exact.get(normalized.replace(" ", ""))
+            if field is None:
+                leftovers.append((i, normalized, unit))
+            elif field not in positions and self._accepts(field, unit):
+                positions[field] = i
+
+        choices = {alias: field for alias, field in self._fuzzy[name].items()
+                   if field not in positions}
+        if not choices:
+            return positions
+
+        # Only imported once a header actually needs fuzzy matching
+        from thefuzz import fuzz, process
+
+        candidates = []
+        for i, normalized, unit in leftovers:
+            if not normalized or len(normalized) > MAX_FUZZY_HEADER:
+                continue
+            scores = {}
+            for alias, score in process.extractBests(normalized, list(choices),
+                                                     scorer=fuzz.token_sort_ratio,
+                                                     score_cutoff=FUZZY_CUTOFF, limit=None):
+                field = choices[alias]
+                if self._accepts(field, unit):
+                    scores[field] = max(score, scores.get(field, 0))
+            ranked = sorted(scores.items(), key=lambda item: -item[1])
+            if ranked and (len(ranked) == 1 or ranked[0][1] > ranked[1][1]):
+                field, score = ranked[0]
+                candidates.append((-score, i, field))
+
+        # Best-scoring pairs first; each field and column is used once
+        taken = set()
+        for _, i, field in sorted(candidates):
+            if field not in positions and i not in taken:
+                positions[field] = i
+                taken.add(i)
+        return positions
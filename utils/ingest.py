@@ -0,0 +1,198 @@
+"""Text and field extraction from uploaded PDF, Word and image reports.
+
+Uploads are parsed from in-memory buffers; nothing is written to named
+temporary files.
+"""
+import io
+import os
+import tempfile
+from collections import namedtuple
+from contextlib import contextmanager
+
+import docx
+from PyPDF2 import PdfReader
+
+from utils.extraction_cache import extraction_cache
+from utils.ocr import ocr_report_fields
+from utils.predictors import parse_fields, parse_pair, report_fields
+
+# Bump whenever extraction output can change for the same file, so cached
+# results from older code are not reused
+EXTRACTOR_VERSION = 6
+
+# PDFs with less text than this are treated as scans and OCR'd
+MIN_PDF_TEXT = 50
+
+# Once the priority predictor's fields are found, PDF pages in a row without
+# any new field before reading stops
+STALE_PAGES = 2
+
+DOCX_MIME = "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
+
+# Uploads above this many bytes are spooled to an anonymous temp file
+SPOOL_THRESHOLD = int(os.environ.get('NEO_SPOOL_THRESHOLD', 64 * 1024 * 1024))
+
+# fields: {field key: value}; stats: pages_total, pages_read, pages_skipped,
+# whether OCR ran and, if so, the OCR tier that finished ('fast' or 'full')
+Extraction = namedtuple('Extraction', ['fields', 'stats'])
+
+
+@contextmanager
+def open_upload(data):
+    """Seekable binary stream over uploaded bytes.
+
+    Uploads up to ``SPOOL_THRESHOLD`` are read straight from memory. Larger
+    ones are spilled to an anonymous temporary file, which the OS removes as
+    soon as it is closed, even if parsing fails.
+    """
+    if len(data) <= SPOOL_THRESHOLD:
+        yield io.BytesIO(data)
+        return
+    with tempfile.TemporaryFile() as spill:
+        spill.write(memoryview(data))
+        spill.seek(0)
+        yield spill
+
+
+def iter_pdf_text(reader):
+    """Yield the text of each PDF page as it is extracted."""
+    for page in reader.pages:
+        yield page.extract_text() or ""
+
+
+def _table_row(row):
+    cells = []
+    for cell in row.cells:
+        text = " ".join(cell.text.split())
+        # Merged cells are returned once per grid column they span
+        if not cells or text != cells[-1]:
+            cells.append(text)
+    return cells
+
+
+def iter_docx_blocks(data):
+    """Yield the content of a Word document in order.
+
+    Paragraphs and rows of wider tables are yielded as text; rows of
+    two-column tables as ``(key, value)`` tuples.
+    """
+    document = docx.Document(io.BytesIO(data))
+    if hasattr(document, 'iter_inner_content'):
+        blocks = document.iter_inner_content()
+    else:
+        # python-docx < 1.1: body paragraphs first, then tables
+        blocks = [*document.paragraphs, *document.tables]
+    for block in blocks:
+        if hasattr(block, 'rows'):
+            for row in block.rows:
+                cells = _table_row(row)
+                yield tuple(cells) if len(cells) == 2 else "  ".join(cells)
+        elif block.text.strip():
+            yield block.text
+
+
+def extract_fields(name, data, mime_type, on_ocr=None, cpu_budget=None, on_progress=None,
+                   priority=None):
+    """Fields of predictor ``name`` (all predictors if None) in an upload.
+
+    PDF pages are extracted one at a time and only the fields still missing
+    are searched for on each new page. Reading stops, and OCR is skipped, as
+    soon as every field has been found. With ``priority``, the predictor
+    whose page started the upload, it also stops once that predictor's
+    fields are all found and ``STALE_PAGES`` further pages added no field:
+    with ``name=None`` every field is wanted, and a full report rarely has
+    them all. Scanned PDFs (less than
+    ``MIN_PDF_TEXT`` characters of text) fall back to OCR of the page images.
+    Word documents are read paragraph by paragraph and table row by table
+    row, with two-column tables taken as key/value pairs, and never OCR'd.
+    ``on_progress(stage, done, total)`` is called after each PDF page and
+    each OCR'd image.
+    """
+    wanted = set(report_fields(name))
+    required = set(report_fields(priority)) & wanted if priority else wanted
+    fields = {}
+    stats = {'pages_total': 1, 'pages_read': 1, 'pages_skipped': 0, 'ocr': False}
+
+    if mime_type == "application/pdf":
+        with open_upload(data) as stream:
+            reader = PdfReader(stream)
+            stats['pages_total'] = len(reader.pages)
+            stats['pages_read'] = 0
+            text_chars = 0
+            stale = 0
+            for page_text in iter_pdf_text(reader):
+                stats['pages_read'] += 1
+                if on_progress:
+                    on_progress("Reading PDF pages", stats['pages_read'], stats['pages_total'])
+                text_chars += len(page_text.strip())
+                found = parse_fields(name, page_text, wanted - fields.keys())
+                fields.update(found)
+                stale = 0 if found else stale + 1
+                if fields.keys() >= wanted or (fields.keys() >= required
+                                               and stale >= STALE_PAGES):
+                    break
+            stats['pages_skipped'] = stats['pages_total'] - stats['pages_read']
+
+            if text_chars < MIN_PDF_TEXT and not fields.keys() >= wanted:
+                if on_ocr:
+                    on_ocr("Attempting OCR on PDF pages...")
+                stats['ocr'] = True
+                # Page order is kept: images are listed page by page and
+                # OCR results come back in the order they were given
+                images = [img.data for page in reader.pages for img in page.images]
+                found, stats['ocr_tier'] = ocr_report_fields(name, images,
+                                                             wanted - fields.keys(),
+                                                             cpu_budget, on_progress)
+                fields.update(found)
+
+    elif mime_type == DOCX_MIME:
+        for block in iter_docx_blocks(data):
+            missing = wanted - fields.keys()
+            if isinstance(block, tuple):
+                # Two-column table row; fall back to reading it as text in
+                # case both cells hold "label value" themselves
+                found = parse_pair(name, *block, keys=missing)
+                fields.update(found or parse_fields(name, "  ".join(block), missing))
+            else:
+                fields.update(parse_fields(name, block, missing))
+            if fields.keys() >= wanted:
+                break
+
+    elif mime_type.startswith('image'):
+        stats['ocr'] = True
+        fields, stats['ocr_tier'] = ocr_report_fields(name, [data], wanted, cpu_budget,
+                                                     on_progress)
+
+    else:
+        raise ValueError(f"Unsupported report type: {mime_type}")
+
+    return {'fields': fields, 'stats': stats}
+
+
+def extract_report_fields(data, mime_type, name=None, on_ocr=None, cpu_budget=None,
+                          on_progress=None, priority=None):
+    """``Extraction`` of the fields for predictor ``name`` from a report.
+
+    With ``name=None`` the fields of all four predictors are extracted in
+    one pass, so one upload can pre-fill every page (see
+    ``utils.shared_report``). Results are cached by the SHA-256 of ``data``
+    together with the predictor and ``EXTRACTOR_VERSION``, so reruns and
+    other sessions that upload the same file skip PDF parsing and OCR
+    entirely. ``cpu_budget`` caps concurrent OCR calls (see ``utils.ocr``);
+    ``on_progress`` and ``priority`` are passed on to ``extract_fields``,
+    and ``priority`` is part of the cache key.
+    """
+    key = extraction_cache.key(data, name or 'all', priority or '', EXTRACTOR_VERSION)
+    result = extraction_cache.get_or_compute(
+        key, lambda: extract_fields(name, data, mime_type, on_ocr, cpu_budget, on_progress,
+                                    priority))
+    return Extraction(dict(result['fields']), dict(result['stats']))
+
+
+def cached_report_fields(data, name=None, priority=None):
+    """Cached ``Extraction`` of a report, or None if it was not read yet."""
+    result = extraction_cache.get(extraction_cache.key(data, name or 'all', priority or '',
+                                                       EXTRACTOR_VERSION))
+    if result is None:
+        return None
+    return Extraction(dict(result['fields']), dict(result['stats']))
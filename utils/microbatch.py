@@ -0,0 +1,166 @@
+"""Coalesce concurrent scoring requests into batched pipeline calls.
+
+Most service requests carry a single row, and scoring one row costs nearly
+as much as scoring dozens: validation, scaling and the forest traversal all
+have per-call overhead. A ``MicroBatcher`` sits in front of one predictor. A
+dispatcher thread takes the first waiting request, keeps collecting
+requests until ``max_batch`` rows are gathered or ``max_wait`` seconds have
+passed since that first request arrived, scores all of them with one call
+and hands each caller its own rows back. A request that would take the batch
+past ``max_batch`` rows waits for the next one.
+
+``max_wait=0`` turns batching off: requests are scored directly in the
+caller's thread. Requests with ``max_batch`` rows or more always are.
+"""
+import os
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+
+import numpy as np
+
+MAX_BATCH = int(os.environ.get('NEO_BATCH_MAX_SIZE', 64))
+MAX_WAIT = float(os.environ.get('NEO_BATCH_MAX_WAIT_MS', 1)) / 1000
+
+# Recent queue delays kept for the percentiles
+DELAY_SAMPLES = 4096
+
+
+class BatchMetrics:
+    """Batch sizes and the queueing delay batching adds, for reporting."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.batches = 0
+        self.requests = 0
+        self.rows = 0
+        # Power-of-two upper bound -> batches with up to that many rows
+        self.sizes = {}
+        self.delay_total = 0.0
+        self.delay_max = 0.0
+        self._delays = deque(maxlen=DELAY_SAMPLES)
+
+    def record(self, rows, delays):
+        bucket = 1 << max(rows - 1, 0).bit_length()
+        with self._lock:
+            self.batches += 1
+            self.requests += len(delays)
+            self.rows += rows
+            self.sizes[bucket] = self.sizes.get(bucket, 0) + 1
+            self.delay_total += sum(delays)
+            self.delay_max = max(self.delay_max, *delays)
+            self._delays.extend(delays)
+
+    def snapshot(self):
+        with self._lock:
+            delays = np.sort(np.fromiter(self._delays, dtype=np.float64))
+            percentiles = {}
+            if delays.size:
+                for p in (50, 95, 99):
+                    percentiles[f'p{p}'] = round(float(np.percentile(delays, p)) * 1e3, 3)
+            return {
+                'batches': self.batches,
+                'requests': self.requests,
+                'rows': self.rows,
+                'mean_batch_rows': round(self.rows / self.batches, 2) if self.batches else 0,
+                'batch_rows_histogram': {f"<={size}": count
+                                         for size, count in sorted(self.sizes.items())},
+                'queue_delay_ms': {
+                    'mean': round(self.delay_total / self.requests * 1e3, 3) if self.requests else 0,
+                    'max': round(self.delay_max * 1e3, 3),
+                    **percentiles,
+                },
+            }
+
+
+class _Request:
+    __slots__ = ('X', 'future', 'submitted')
+
+    def __init__(self, X):
+        self.X = X
+        self.future = Future()
+        self.submitted = time.monotonic()
+
+
+class MicroBatcher:
+    """Batches calls to ``score(X) -> (results, context)`` for one predictor.
+
+    ``score`` gets the stacked rows of a batch and returns one result per
+    row plus a context value (e.g. the model version) shared by the batch.
+    """
+
+    def __init__(self, score, max_batch=MAX_BATCH, max_wait=MAX_WAIT, name='batch'):
+        self._score = score
+        self.max_batch = max(1, max_batch)
+        self.max_wait = max(0.0, max_wait)
+        self.metrics = BatchMetrics()
+        self._queue = queue.SimpleQueue()
+        # Request that did not fit the last batch; only the dispatcher uses it
+        self._held = None
+        self._thread = None
+        self._start_lock = threading.Lock()
+        self._name = name
+
+    def _start(self):
+        with self._start_lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, daemon=True,
+                                                name=f"microbatch-{self._name}")
+                self._thread.start()
+
+    def score(self, X):
+        """``(results, context)`` for the rows of ``X``, possibly batched with others."""
+        X = np.asarray(X, dtype=np.float64)
+        if X.ndim == 1:
+            X = X.reshape(1, -1)
+        if not self.max_wait or len(X) >= self.max_batch:
+            results, context = self._score(X)
+            self.metrics.record(len(X), [0.0])
+            return results, context
+        request = _Request(X)
+        self._start()
+        self._queue.put(request)
+        return request.future.result()
+
+    def _collect(self):
+        first, self._held = self._held or self._queue.get(), None
+        batch = [first]
+        rows = len(first.X)
+        deadline = batch[0].submitted + self.max_wait
+        while rows < self.max_batch:
+            # Requests already waiting are always taken; only block for
+            # more while the first one's window is open
+            timeout = deadline - time.monotonic()
+            try:
+                if timeout > 0:
+                    request = self._queue.get(timeout=timeout)
+                else:
+                    request = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if rows + len(request.X) > self.max_batch:
+                # Would overflow the batch: it starts the next one instead
+                self._held = request
+                break
+            batch.append(request)
+            rows += len(request.X)
+        return batch, rows
+
+    def _run(self):
+        while True:
+            batch, rows = self._collect()
+            started = time.monotonic()
+            try:
+                results, context = self._score(np.concatenate([r.X for r in batch]))
+            except Exception as e:
+                for request in batch:
+                    request.future.set_exception(e)
+                continue
+            self.metrics.record(rows, [started - r.submitted for r in batch])
+            offset = 0
+            for request in batch:
+                end = offset + len(request.X)
+                request.future.set_result((results[offset:end], context))
+                offset = end
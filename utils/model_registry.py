@@ -0,0 +1,141 @@
+"""Process-wide cache of the trained predictor pipelines.
+
+Streamlit re-executes every page script on each widget interaction, but
+imported modules live for the whole server process. Keeping the loaded
+pipelines here means each artifact is loaded once per process and the same
+read-only ``PredictorPipeline`` is handed to every session. An artifact is
+only reloaded when its mtime/size changes *and* its SHA-256 differs from the
+copy already in memory.
+
+Pickled pipelines are compiled to a vectorized ``FlatForest`` on load (see
+``utils.forest``). When a memory-mapped artifact directory (see
+``utils.artifact``) exists next to a ``.pkl`` it is preferred, so several
+server processes share one copy of the tree arrays.
+
+Each loaded pipeline carries its own prediction cache (see
+``utils.prediction_cache``); reloading an artifact drops the old one.
+"""
+import os
+import threading
+import time
+
+from utils.artifact import META_FILE, file_checksum, load_artifact
+from utils.forest import compile_pipeline
+from utils.pipeline import PredictorPipeline
+from utils.prediction_cache import new_prediction_cache
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MODELS_DIR = os.path.join(PROJECT_ROOT, "models")
+
+# Predictor name -> pipeline file written by the matching train_*.py script
+ARTIFACTS = {
+    'diabetes': 'diabetes_model.pkl',
+    'fever': 'fever_model.pkl',
+    'thyroid': 'thyroid_model.pkl',
+    'bp': 'bp_model.pkl',
+}
+
+
+def _unpickle(path):
+    # joblib (and sklearn, through the pickle) are only needed for .pkl files
+    import joblib
+
+    return joblib.load(path)
+
+
+class _Entry:
+    __slots__ = ('path', 'stat', 'checksum', 'pipeline', 'loaded_at', 'load_seconds')
+
+    def __init__(self, path, stat, checksum, pipeline, load_seconds):
+        self.path = path
+        self.stat = stat
+        self.checksum = checksum
+        self.pipeline = pipeline
+        self.loaded_at = time.time()
+        self.load_seconds = load_seconds
+
+
+class ModelRegistry:
+    """Loads each predictor pipeline once and shares it across sessions."""
+
+    def __init__(self, models_dir=MODELS_DIR, artifacts=ARTIFACTS):
+        self.models_dir = models_dir
+        self.artifacts = dict(artifacts)
+        self._entries = {}
+        self._locks = {name: threading.Lock() for name in self.artifacts}
+
+    def path(self, name):
+        if name not in self.artifacts:
+            raise KeyError(f"Unknown predictor '{name}'. "
+                           f"Expected one of: {', '.join(self.artifacts)}")
+        return os.path.join(self.models_dir, self.artifacts[name])
+
+    def flat_path(self, name):
+        """Directory of the memory-mapped artifact for ``name``."""
+        return os.path.splitext(self.path(name))[0]
+
+    def source(self, name):
+        """File whose mtime/checksum tracks ``name``, and how to load it."""
+        flat_dir = self.flat_path(name)
+        meta_path = os.path.join(flat_dir, META_FILE)
+        if os.path.exists(meta_path):
+            return meta_path, lambda: load_artifact(flat_dir)
+        path = self.path(name)
+        return path, lambda: compile_pipeline(_unpickle(path))
+
+    def get(self, name):
+        """Return the read-only ``PredictorPipeline`` for ``name``."""
+        path, load = self.source(name)
+        st = os.stat(path)
+        stat = (st.st_mtime_ns, st.st_size)
+
+        entry = self._entries.get(name)
+        if entry is not None and entry.path == path and entry.stat == stat:
+            return entry.pipeline
+
+        with self._locks[name]:
+            entry = self._entries.get(name)
+            if entry is not None and entry.path == path and entry.stat == stat:
+                return entry.pipeline
+
+            checksum = file_checksum(path)
+            if entry is not None and entry.checksum == checksum:
+                # Touched but not modified: keep the loaded copy
+                entry.stat = stat
+                return entry.pipeline
+
+            start = time.perf_counter()
+            pipeline = PredictorPipeline(load(), version=checksum[:12],
+                                         cache=new_prediction_cache())
+            self._entries[name] = _Entry(path, stat, checksum, pipeline,
+                                         time.perf_counter() - start)
+            if entry is not None:
+                entry.pipeline.cache.clear()
+            return pipeline
+
+    def version(self, name):
+        """Short content hash of the currently loaded artifact."""
+        self.get(name)
+        return self._entries[name].checksum[:12]
+
+    def info(self, name):
+        """Load metadata for ``name``, or ``None`` if it is not loaded yet."""
+        entry = self._entries.get(name)
+        if entry is None:
+            return None
+        return {
+            'path': entry.path,
+            'version': entry.checksum[:12],
+            'checksum': entry.checksum,
+            'loaded_at': entry.loaded_at,
+            'load_seconds': entry.load_seconds,
+            'prediction_cache': entry.pipeline.cache.stats(),
+        }
+
+
+registry = ModelRegistry()
+
+
+def get_pipeline(name):
+    """Shortcut for ``registry.get(name)`` on the process-wide registry."""
+    return registry.get(name)
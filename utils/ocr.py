@@ -0,0 +1,200 @@
+"""OCR of report images with a bounded worker pool.
+
+The OCR engine comes from ``utils.ocr_backends`` (``NEO_OCR_BACKEND``):
+in-process tesserocr when installed, else one pytesseract subprocess per
+image. Both block with the GIL released, so a thread pool is enough to keep
+several cores busy. Each request gets at most ``OCR_CPU_BUDGET`` concurrent
+OCR calls (``NEO_OCR_WORKERS``, default: all cores), and tesseract is
+limited to one OpenMP thread per call so the budget maps to real cores.
+
+Images are cleaned up first (see ``utils.preprocess``) unless
+``NEO_OCR_PREPROCESS=0``; ``NEO_OCR_DESKEW=1`` also straightens them.
+
+Report fields are read in two tiers (``ocr_report_fields``): a cheap pass
+over images downscaled to ``FAST_DPI`` with a single-block page layout and a
+character whitelist, then a full-resolution pass only when that left a
+labelled field unread, read a value from low-confidence words, or produced
+mostly low-confidence text. ``NEO_OCR_TIERED=0`` always runs the full pass.
+"""
+import io
+import os
+import string
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from PIL import Image
+
+from utils.extractor import FIELD_SPECS, extractor
+from utils.ocr_backends import load_backend
+from utils.predictors import convert_value, parse_fields, report_fields
+from utils.preprocess import TARGET_DPI, preprocess_image
+
+OCR_CPU_BUDGET = int(os.environ.get('NEO_OCR_WORKERS', 0)) or os.cpu_count() or 1
+OCR_PREPROCESS = os.environ.get('NEO_OCR_PREPROCESS', '1') != '0'
+OCR_DESKEW = os.environ.get('NEO_OCR_DESKEW', '0') == '1'
+OCR_TIERED = os.environ.get('NEO_OCR_TIERED', '1') != '0'
+FAST_DPI = int(os.environ.get('NEO_OCR_FAST_DPI', 150))
+
+# Words tesseract scores below this (0-100) do not count as read
+MIN_WORD_CONFIDENCE = 60
+
+# Fast-tier text with more low-confidence words than this is not trusted
+MAX_LOW_CONFIDENCE_SHARE = 0.3
+
+# Read by tesseract when it loads, in-process or as a pytesseract subprocess
+os.environ.setdefault('OMP_THREAD_LIMIT', '1')
+
+# text: words joined by spaces and newlines; low_confidence: (start, end)
+# spans of words below MIN_WORD_CONFIDENCE; words: number of words
+OcrText = namedtuple('OcrText', ['text', 'low_confidence', 'words'])
+
+
+def _fast_whitelist():
+    # Digits, separators, unit symbols and every letter of a label or value
+    chars = set(string.digits + ".,:;%/-()")
+    for labels, value, units in FIELD_SPECS.values():
+        for text in (*labels, value):
+            chars.update(c for c in text if c.isalpha())
+        chars.update(c for unit in units for c in unit if not c.isspace())
+    chars |= {c.swapcase() for c in chars}
+    return "".join(sorted(chars))
+
+
+backend = load_backend(os.environ.get('NEO_OCR_BACKEND', 'auto'), _fast_whitelist())
+
+
+def ocr_image(image, preprocess=None):
+    """OCR one PIL image, preprocessed unless ``preprocess`` is False."""
+    if OCR_PREPROCESS if preprocess is None else preprocess:
+        image, dpi = preprocess_image(image, deskew=OCR_DESKEW)
+        return backend.image_to_string(image, dpi=dpi)
+    return backend.image_to_string(image)
+
+
+def ocr_image_bytes(data):
+    """OCR one encoded image (PNG, JPEG, ...) straight from memory."""
+    return ocr_image(Image.open(io.BytesIO(data)))
+
+
+def ocr_words(image, fast=False):
+    """``OcrText`` of one PIL image, with per-word confidences.
+
+    ``fast`` reads a copy downscaled to ``FAST_DPI`` with the backend's
+    fast-tier settings.
+    """
+    dpi = None
+    if OCR_PREPROCESS:
+        image, dpi = preprocess_image(image, target_dpi=FAST_DPI if fast else TARGET_DPI,
+                                      deskew=OCR_DESKEW)
+    data = backend.image_to_data(image, dpi=dpi, fast=fast)
+
+    parts, low_confidence, line = [], [], None
+    position = 0
+    for i, word in enumerate(data['text']):
+        word = word.strip()
+        if not word:
+            continue
+        word_line = (data['block_num'][i], data['par_num'][i], data['line_num'][i])
+        if parts:
+            parts.append(" " if word_line == line else "\n")
+            position += 1
+        line = word_line
+        if 0 <= float(data['conf'][i]) < MIN_WORD_CONFIDENCE:
+            low_confidence.append((position, position + len(word)))
+        parts.append(word)
+        position += len(word)
+    return OcrText("".join(parts), low_confidence, (len(parts) + 1) // 2)
+
+
+def _ocr_words_fast(data):
+    return ocr_words(Image.open(io.BytesIO(data)), fast=True)
+
+
+def _map(func, images, cpu_budget=None, on_progress=None, stage="OCR"):
+    """``func`` over ``images`` in order, calling ``on_progress(stage, done, total)``.
+
+    An exception raised by ``on_progress`` (e.g. a cancelled job) stops the
+    images that have not started yet.
+    """
+    workers = min(len(images), cpu_budget or OCR_CPU_BUDGET)
+    if workers <= 1:
+        results = []
+        for data in images:
+            results.append(func(data))
+            if on_progress:
+                on_progress(stage, len(results), len(images))
+        return results
+    pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='ocr')
+    try:
+        futures = [pool.submit(func, data) for data in images]
+        for done, _ in enumerate(as_completed(futures), 1):
+            if on_progress:
+                on_progress(stage, done, len(images))
+        return [future.result() for future in futures]
+    finally:
+        pool.shutdown(cancel_futures=True)
+
+
+def ocr_images(images, cpu_budget=None, on_progress=None):
+    """OCR encoded images concurrently; texts come back in input order."""
+    return _map(ocr_image_bytes, images, cpu_budget, on_progress)
+
+
+def confident_fields(name, ocr_text, keys):
+    """Fields in ``ocr_text``, split into confident and low-confidence reads.
+
+    A read is low-confidence when any word from its label to the end of its
+    value is below ``MIN_WORD_CONFIDENCE``.
+    """
+    confident, uncertain = {}, {}
+    fields = [key for key in report_fields(name) if key in keys]
+    for key, match in extractor.extract(ocr_text.text, fields).items():
+        try:
+            value = convert_value(key, match.value, match.unit)
+        except ValueError:
+            continue
+        shaky = any(start < match.end and match.offset < end
+                    for start, end in ocr_text.low_confidence)
+        (uncertain if shaky else confident)[key] = value
+    return confident, uncertain
+
+
+def ocr_report_fields(name, images, keys, cpu_budget=None, on_progress=None):
+    """Fields ``keys`` of predictor ``name`` read from encoded images.
+
+    Returns ``(fields, tier)`` where tier is ``'fast'`` when the cheap pass
+    was enough and ``'full'`` otherwise. ``on_progress(stage, done, total)``
+    is called as each image of each pass is read.
+    """
+    keys = set(keys)
+    fields, uncertain = {}, {}
+    if OCR_TIERED:
+        results = _map(_ocr_words_fast, images, cpu_budget, on_progress, "Quick OCR pass")
+        low, words, labelled = 0, 0, set()
+        for result in results:
+            confident, shaky = confident_fields(name, result, keys - fields.keys())
+            fields.update(confident)
+            for key, value in shaky.items():
+                uncertain.setdefault(key, value)
+            low += len(result.low_confidence)
+            words += result.words
+            labelled |= extractor.labelled_fields(result.text)
+
+        # Missing fields whose label was never seen are most likely not in
+        # the report at all, unless the text itself is unreliable
+        garbled = low > MAX_LOW_CONFIDENCE_SHARE * max(words, 1)
+        retry = keys - fields.keys()
+        if not garbled:
+            retry &= labelled | set(uncertain)
+        if not retry:
+            return fields, 'fast'
+    else:
+        retry = keys
+
+    for text in ocr_images(images, cpu_budget, on_progress):
+        fields.update(parse_fields(name, text, retry - fields.keys()))
+        if fields.keys() >= retry:
+            break
+    for key, value in uncertain.items():
+        fields.setdefault(key, value)
+    return fields, 'full'
@@ -0,0 +1,140 @@
+"""Interchangeable OCR engines behind one small interface.
+
+Every backend offers ``image_to_string(image, dpi=None, fast=False)`` and
+``image_to_data(image, dpi=None, fast=False)``. The latter returns words
+with confidences in the layout of pytesseract's ``Output.DICT``: parallel
+``text``, ``conf``, ``block_num``, ``par_num`` and ``line_num`` lists.
+``fast`` selects the restricted fast-tier settings: single text block plus
+the character whitelist the backend was created with.
+
+``TesserocrBackend`` keeps tesseract in-process: each ``PyTessBaseAPI``
+loads the language model once and is reused for every later image, instead
+of one ``tesseract`` process (and its temp files) per call. It needs the
+optional ``tesserocr`` package. ``PytesseractBackend`` is the fallback.
+``load_backend`` picks one from ``NEO_OCR_BACKEND`` (``auto``,
+``tesserocr`` or ``pytesseract``).
+"""
+import queue
+import shlex
+from contextlib import contextmanager
+
+import pytesseract
+
+
+class PytesseractBackend:
+    """One ``tesseract`` subprocess per call, via pytesseract."""
+
+    name = 'pytesseract'
+
+    def __init__(self, whitelist=''):
+        self.fast_config = "--psm 6"
+        if whitelist:
+            self.fast_config += f" -c tessedit_char_whitelist={shlex.quote(whitelist)}"
+
+    def _config(self, dpi, fast):
+        config = f"--dpi {dpi}" if dpi else ""
+        return f"{config} {self.fast_config}" if fast else config
+
+    def available(self):
+        try:
+            pytesseract.get_tesseract_version()
+        except pytesseract.TesseractNotFoundError:
+            return False
+        return True
+
+    def image_to_string(self, image, dpi=None, fast=False):
+        return pytesseract.image_to_string(image, config=self._config(dpi, fast))
+
+    def image_to_data(self, image, dpi=None, fast=False):
+        return pytesseract.image_to_data(image, config=self._config(dpi, fast),
+                                         output_type=pytesseract.Output.DICT)
+
+
+class TesserocrBackend:
+    """In-process tesseract with a pool of initialised ``PyTessBaseAPI``s.
+
+    An API object must only be used by one thread at a time, so each call
+    borrows one from a free list and returns it afterwards. The pool grows
+    to the peak number of concurrent calls (bounded by the OCR worker
+    count) and the models stay loaded for the life of the process.
+    """
+
+    name = 'tesserocr'
+
+    def __init__(self, whitelist=''):
+        import tesserocr
+
+        self._tesserocr = tesserocr
+        self.whitelist = whitelist
+        self._pools = {False: queue.SimpleQueue(), True: queue.SimpleQueue()}
+
+    def available(self):
+        return True
+
+    def _new_api(self, fast):
+        tesserocr = self._tesserocr
+        api = tesserocr.PyTessBaseAPI(
+            psm=tesserocr.PSM.SINGLE_BLOCK if fast else tesserocr.PSM.AUTO)
+        if fast and self.whitelist:
+            api.SetVariable('tessedit_char_whitelist', self.whitelist)
+        return api
+
+    @contextmanager
+    def _api(self, image, dpi, fast):
+        pool = self._pools[fast]
+        try:
+            api = pool.get_nowait()
+        except queue.Empty:
+            api = self._new_api(fast)
+        try:
+            api.SetImage(image)
+            if dpi:
+                api.SetSourceResolution(int(dpi))
+            yield api
+        finally:
+            api.Clear()
+            pool.put(api)
+
+    def image_to_string(self, image, dpi=None, fast=False):
+        with self._api(image, dpi, fast) as api:
+            return api.GetUTF8Text()
+
+    def image_to_data(self, image, dpi=None, fast=False):
+        RIL = self._tesserocr.RIL
+        data = {'text': [], 'conf': [], 'block_num': [], 'par_num': [], 'line_num': []}
+        block = par = line = 0
+        with self._api(image, dpi, fast) as api:
+            api.Recognize()
+            iterator = api.GetIterator()
+            for word in self._tesserocr.iterate_level(iterator, RIL.WORD):
+                if word.IsAtBeginningOf(RIL.BLOCK):
+                    block, par, line = block + 1, 0, 0
+                if word.IsAtBeginningOf(RIL.PARA):
+                    par, line = par + 1, 0
+                if word.IsAtBeginningOf(RIL.TEXTLINE):
+                    line += 1
+                data['text'].append(word.GetUTF8Text(RIL.WORD) or '')
+                data['conf'].append(word.Confidence(RIL.WORD))
+                data['block_num'].append(block)
+                data['par_num'].append(par)
+                data['line_num'].append(line)
+        return data
+
+
+BACKENDS = {
+    PytesseractBackend.name: PytesseractBackend,
+    TesserocrBackend.name: TesserocrBackend,
+}
+
+
+def load_backend(name='auto', whitelist=''):
+    """OCR backend ``name``; ``auto`` prefers tesserocr when installed."""
+    if name == 'auto':
+        try:
+            return TesserocrBackend(whitelist)
+        except ImportError:
+            return PytesseractBackend(whitelist)
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown OCR backend '{name}'. "
+                         f"Expected one of: auto, {', '.join(BACKENDS)}")
+    return BACKENDS[name](whitelist)
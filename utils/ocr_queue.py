@@ -0,0 +1,202 @@
+"""Server-wide queue for report extractions that may need OCR.
+
+Streamlit runs every session's script in its own thread, so uploads read
+inline would start one OCR run per session with nothing bounding the total.
+Instead, uploads are submitted here and read by a fixed number of worker
+threads (``NEO_OCR_QUEUE_WORKERS``) shared by the whole process. Each job
+gets an equal share of ``OCR_CPU_BUDGET``, so all workers together never run
+more tesseract calls than that.
+
+Sessions are served round-robin: one job of each waiting session in turn, so
+one user queueing several reports does not hold everyone else up. Submitting
+fails with ``QueueFull`` when ``NEO_OCR_QUEUE_DEPTH`` jobs are already waiting
+or the session has ``NEO_OCR_SESSION_JOBS`` jobs queued or running.
+
+A job's function is called with an extra ``on_progress(stage, done, total)``
+keyword argument. It records ``OcrJob.progress`` and, once ``cancel`` was
+called on a running job, raises ``JobCancelled`` to stop it at its next page
+or image.
+"""
+import itertools
+import os
+import threading
+import time
+from collections import OrderedDict, deque
+
+from utils.ocr import OCR_CPU_BUDGET
+
+OCR_QUEUE_WORKERS = int(os.environ.get('NEO_OCR_QUEUE_WORKERS', 2))
+MAX_QUEUE_DEPTH = int(os.environ.get('NEO_OCR_QUEUE_DEPTH', 32))
+MAX_SESSION_JOBS = int(os.environ.get('NEO_OCR_SESSION_JOBS', 2))
+
+
+class QueueFull(Exception):
+    """The queue or the session's share of it is at its limit."""
+
+
+class JobCancelled(Exception):
+    """Raised inside a running job whose cancellation was requested."""
+
+
+class OcrJob:
+    """One queued call; ``status`` is queued, running, done, failed or cancelled."""
+
+    _ids = itertools.count(1)
+
+    def __init__(self, session_id, func, args, kwargs):
+        self.id = next(self._ids)
+        self.session_id = session_id
+        self.func = func
+        self.args = args
+        self.kwargs = kwargs
+        self.status = 'queued'
+        self.result = None
+        self.error = None
+        # (stage, done, total) last reported by the job, or None
+        self.progress = None
+        self.cancel_requested = False
+        self.submitted = time.monotonic()
+        self.started = None
+        self.finished = None
+
+    def done(self):
+        return self.status in ('done', 'failed', 'cancelled')
+
+    def report(self, stage, done, total):
+        """Progress callback handed to the job's function."""
+        if self.cancel_requested:
+            raise JobCancelled()
+        self.progress = (stage, done, total)
+
+    def __repr__(self):
+        return f"OcrJob({self.id}, session={self.session_id!r}, status={self.status})"
+
+
+class OcrQueue:
+    """Fixed worker pool fed from per-session FIFOs in round-robin order."""
+
+    def __init__(self, workers=OCR_QUEUE_WORKERS, max_depth=MAX_QUEUE_DEPTH,
+                 max_session_jobs=MAX_SESSION_JOBS):
+        self.workers = max(1, workers)
+        self.max_depth = max_depth
+        self.max_session_jobs = max_session_jobs
+        self.cpu_budget = max(1, OCR_CPU_BUDGET // self.workers)
+        # session id -> deque of queued jobs; order is the round-robin order
+        self._sessions = OrderedDict()
+        self._running = {}
+        self._depth = 0
+        self._cond = threading.Condition()
+        self._threads = []
+
+    def _start(self):
+        while len(self._threads) < self.workers:
+            thread = threading.Thread(target=self._work, daemon=True,
+                                      name=f"ocr-queue-{len(self._threads)}")
+            thread.start()
+            self._threads.append(thread)
+
+    def submit(self, session_id, func, *args, **kwargs):
+        """Queue ``func(*args, on_progress=..., **kwargs)`` for ``session_id``.
+
+        Returns the ``OcrJob``; raises ``QueueFull`` when over a limit.
+        """
+        with self._cond:
+            if self._depth >= self.max_depth:
+                raise QueueFull(f"{self._depth} reports waiting")
+            active = len(self._sessions.get(session_id, ())) + self._running.get(session_id, 0)
+            if active >= self.max_session_jobs:
+                raise QueueFull(f"{active} of your reports still in progress")
+            job = OcrJob(session_id, func, args, kwargs)
+            self._sessions.setdefault(session_id, deque()).append(job)
+            self._depth += 1
+            self._start()
+            self._cond.notify()
+        return job
+
+    def cancel(self, job):
+        """Stop ``job``; False if it had already finished.
+
+        A queued job is dropped at once; a running one stops at its next
+        progress report.
+        """
+        with self._cond:
+            if job.status == 'running':
+                job.cancel_requested = True
+                return True
+            jobs = self._sessions.get(job.session_id)
+            if job.status != 'queued' or not jobs or job not in jobs:
+                return False
+            jobs.remove(job)
+            if not jobs:
+                del self._sessions[job.session_id]
+            self._depth -= 1
+            job.status = 'cancelled'
+            job.finished = time.monotonic()
+        return True
+
+    def position(self, job):
+        """Jobs that will start before ``job``; 0 once it is running or done."""
+        with self._cond:
+            jobs = self._sessions.get(job.session_id)
+            if job.status != 'queued' or not jobs or job not in jobs:
+                return 0
+            # Each round serves every waiting session once, in order; a
+            # session before this one in the round also goes once more
+            index = jobs.index(job)
+            ahead = index
+            before = True
+            for session_id, others in self._sessions.items():
+                if session_id == job.session_id:
+                    before = False
+                    continue
+                ahead += min(len(others), index + before)
+            return ahead
+
+    def stats(self):
+        with self._cond:
+            return {
+                'workers': self.workers,
+                'queued': self._depth,
+                'running': sum(self._running.values()),
+                'sessions': len(self._sessions),
+            }
+
+    def _next_job(self):
+        session_id, jobs = next(iter(self._sessions.items()))
+        job = jobs.popleft()
+        if jobs:
+            # This session goes to the back of the round
+            self._sessions.move_to_end(session_id)
+        else:
+            del self._sessions[session_id]
+        self._depth -= 1
+        self._running[session_id] = self._running.get(session_id, 0) + 1
+        job.status = 'running'
+        job.started = time.monotonic()
+        return job
+
+    def _work(self):
+        while True:
+            with self._cond:
+                while not self._sessions:
+                    self._cond.wait()
+                job = self._next_job()
+            status = 'done'
+            try:
+                job.result = job.func(*job.args, on_progress=job.report, **job.kwargs)
+            except JobCancelled:
+                status = 'cancelled'
+            except Exception as e:
+                job.error = e
+                status = 'failed'
+            with self._cond:
+                self._running[job.session_id] -= 1
+                if not self._running[job.session_id]:
+                    del self._running[job.session_id]
+                # Set last, so a session that sees its job finished can
+                # submit the next one straight away
+                job.finished = time.monotonic()
+                job.status = status
+
+
+ocr_queue = OcrQueue()
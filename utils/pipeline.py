@@ -0,0 +1,99 @@
+"""Read-only predictor pipeline with a fused scoring call.
+
+Wraps the ``{'model', 'scaler', 'encoder', ...}`` dict saved by the
+train_*.py scripts. ``score`` scales the input, walks the forest once for the
+class probabilities and derives the decoded label and top-k classes from
+them, instead of separate ``predict`` / ``predict_proba`` /
+``inverse_transform`` calls. With a ``PredictionCache`` attached, rows
+that were scored before are answered from it.
+"""
+from collections import namedtuple
+from collections.abc import Mapping
+from types import MappingProxyType
+
+import numpy as np
+
+# label: decoded class name; probabilities: {class name: probability};
+# top_k: [(class name, probability), ...] sorted by descending probability
+Score = namedtuple('Score', ['label', 'probabilities', 'top_k'])
+
+
+class PredictorPipeline(Mapping):
+    """Read-only view of a saved pipeline dict."""
+
+    def __init__(self, components, version=None, cache=None):
+        self.version = version
+        self.cache = cache
+        self._components = MappingProxyType({
+            key: MappingProxyType(dict(value)) if isinstance(value, dict) else value
+            for key, value in components.items()
+        })
+        model = self._components['model']
+        encoder = self._components['encoder']
+        # Decoded name for each column of predict_proba
+        self.class_names = [str(c) for c in encoder.inverse_transform(model.classes_)]
+
+    def __getitem__(self, key):
+        return self._components[key]
+
+    def __iter__(self):
+        return iter(self._components)
+
+    def __len__(self):
+        return len(self._components)
+
+    def predict_proba(self, X):
+        """Class probabilities for raw (unscaled) feature rows."""
+        X = np.asarray(X, dtype=np.float64)
+        if X.ndim == 1:
+            X = X.reshape(1, -1)
+        model = self['model']
+        if getattr(model, 'raw_input', False):
+            # Scaler already folded into the tree thresholds
+            return model.predict_proba(X)
+        return model.predict_proba(self['scaler'].transform(X))
+
+    def classify(self, X):
+        """Decoded labels and class probabilities for a batch of raw rows."""
+        proba = self.predict_proba(X)
+        labels = np.asarray(self.class_names, dtype=object)[np.argmax(proba, axis=1)]
+        return labels, proba
+
+    def score(self, X, top_k=3):
+        """Score raw feature rows in a single forest traversal.
+
+        Returns one ``Score`` per row. The label is the arg-max class, which
+        is exactly what ``model.predict`` would return. Rows found in the
+        cache are not re-scored; the others are scored together.
+        """
+        X = np.asarray(X, dtype=np.float64)
+        if X.ndim == 1:
+            X = X.reshape(1, -1)
+        if self.cache is None:
+            return self._score(X, top_k)
+
+        keys = [(self.version, row.tobytes(), top_k) for row in X]
+        scores = [self.cache.get(key) for key in keys]
+        missing = [i for i, score in enumerate(scores) if score is None]
+        if missing:
+            for i, score in zip(missing, self._score(X[missing], top_k)):
+                self.cache.put(keys[i], score)
+                scores[i] = score
+        # Copies, so callers cannot change what the cache holds
+        return [score._replace(probabilities=dict(score.probabilities), top_k=list(score.top_k))
+                for score in scores]
+
+    def _score(self, X, top_k):
+        proba = self.predict_proba(X)
+        top_k = min(top_k, proba.shape[1])
+        # Stable sort so ties keep class order, matching np.argmax
+        ranked = np.argsort(-proba, axis=1, kind='stable')[:, :top_k]
+        names = self.class_names
+        return [
+            Score(
+                label=names[order[0]],
+                probabilities=dict(zip(names, row.tolist())),
+                top_k=[(names[i], float(row[i])) for i in order],
+            )
+            for row, order in zip(proba, ranked)
+        ]
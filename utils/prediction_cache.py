@@ -0,0 +1,67 @@
+"""Bounded cache of scored feature rows for one loaded pipeline.
+
+Pages score a single encoded row each time the predict button is pressed,
+and users often press it again with unchanged inputs or switch back and
+forth between the same values. Each ``PredictorPipeline`` the registry
+loads gets its own ``PredictionCache``, keyed by the model version and the
+encoded row, so such repeats skip the forest. A reloaded artifact comes with
+a new, empty cache; the old one is cleared. Entries also expire after
+``NEO_PREDICTION_CACHE_TTL`` seconds.
+"""
+import os
+import threading
+import time
+from collections import OrderedDict
+
+DEFAULT_MAX_ENTRIES = 1024
+DEFAULT_TTL = 3600.0
+
+
+class PredictionCache:
+    """Thread-safe LRU with a time-to-live per entry."""
+
+    def __init__(self, max_entries=DEFAULT_MAX_ENTRIES, ttl=DEFAULT_TTL):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                stored_at, value = entry
+                if not self.ttl or time.monotonic() - stored_at < self.ttl:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._entries[key]
+            self.misses += 1
+            return None
+
+    def put(self, key, value):
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (time.monotonic(), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            return {'entries': len(self._entries), 'hits': self.hits, 'misses': self.misses}
+
+
+def new_prediction_cache():
+    """``PredictionCache`` sized by ``NEO_PREDICTION_CACHE_SIZE`` / ``_TTL``."""
+    return PredictionCache(
+        max_entries=int(os.environ.get('NEO_PREDICTION_CACHE_SIZE', DEFAULT_MAX_ENTRIES)),
+        ttl=float(os.environ.get('NEO_PREDICTION_CACHE_TTL', DEFAULT_TTL)),
+    )
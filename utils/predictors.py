@@ -0,0 +1,384 @@
+"""Form fields, CSV column aliases and feature encoding for each predictor.
+
+The pages, the batch scorer and the scoring service all describe inputs with
+the same field keys the pages keep in ``st.session_state`` (``age``,
+``gender``, ``hba1c``, ...). ``FIELDS`` lists them in the order of each
+pipeline's ``feature_names``.
+
+pandas is only imported by the functions that take a DataFrame, so the row
+path (``encode_rows``, report parsing) and the pages work without it.
+"""
+import math
+import re
+
+import numpy as np
+
+from utils.extractor import extractor
+from utils.headers import HeaderResolver, header_unit, normalize_header
+
+FIELDS = {
+    'diabetes': ['age', 'gender', 'bmi', 'glucose', 'hba1c', 'fasting',
+                 'post_meal', 'family_history'],
+    'fever': ['age', 'gender', 'temp', 'headache', 'muscle_pain', 'fatigue',
+              'chills', 'severity', 'dehydration', 'duration', 'heart_rate'],
+    'thyroid': ['age', 'TSH', 'T3', 'T4', 'TT4', 'T4U', 'FTI'],
+    'bp': ['age', 'gender', 'weight', 'height', 'bmi', 'systolic', 'diastolic',
+           'cholesterol', 'pulse'],
+}
+
+# Lowercase CSV header aliases accepted for each field, including each
+# pipeline's own feature_names (matched fuzzily too, see utils.headers)
+COLUMN_MAPS = {
+    'diabetes': {
+        'age': ['age', 'patient age', 'years'],
+        'gender': ['gender', 'sex'],
+        'bmi': ['bmi', 'body mass index'],
+        'glucose': ['glucose', 'glucose level', 'blood glucose', 'glu'],
+        'hba1c': ['hba1c', 'a1c', 'glycated hemoglobin'],
+        'fasting': ['fasting', 'fbs', 'fasting bs', 'fasting blood sugar', 'fasting glucose'],
+        'post_meal': ['post meal', 'post meal blood sugar', 'post meal glucose',
+                      'postprandial', 'ppbs'],
+        'family_history': ['family history', 'diabetes history'],
+    },
+    'fever': {
+        'age': ['age', 'patient age'],
+        'gender': ['gender', 'sex'],
+        'temp': ['temp', 'temperature', 'body temperature'],
+        'duration': ['duration', 'days'],
+        'heart_rate': ['heart_rate', 'heart rate', 'hr', 'pulse'],
+        'severity': ['severity', 'severity_level'],
+        'dehydration': ['dehydration', 'dehydration level', 'hydration'],
+        'headache': ['headache', 'head_pain'],
+        'muscle_pain': ['muscle_pain', 'muscle pain', 'myalgia'],
+        'fatigue': ['fatigue', 'tiredness'],
+        'chills': ['chills', 'shivering'],
+    },
+    'thyroid': {
+        'age': ['age', 'patient age'],
+        'TSH': ['tsh', 'thyroid stimulating hormone'],
+        'T3': ['t3', 'triiodothyronine'],
+        'T4': ['t4', 'thyroxine'],
+        'TT4': ['tt4', 'total t4'],
+        'T4U': ['t4u', 't4 uptake'],
+        'FTI': ['fti', 'free thyroid index'],
+    },
+    'bp': {
+        'age': ['age', 'patient age', 'years'],
+        'gender': ['gender', 'sex'],
+        'weight': ['weight', 'wt', 'body weight'],
+        'height': ['height', 'ht', 'body height'],
+        'bmi': ['bmi', 'body mass index'],
+        'systolic': ['systolic', 'systolic bp', 'sys', 'sbp'],
+        'diastolic': ['diastolic', 'diastolic bp', 'dia', 'dbp'],
+        'cholesterol': ['cholesterol', 'chol', 'tc'],
+        'pulse': ['pulse', 'pulse rate', 'heart rate', 'hr'],
+    },
+}
+
+# Fields read from uploaded report text (see utils.extractor)
+REPORT_FIELDS = {
+    'diabetes': ['age', 'glucose', 'bmi', 'hba1c', 'fasting', 'post_meal', 'gender',
+                 'family_history'],
+    'fever': ['age', 'temp', 'duration', 'heart_rate', 'severity', 'dehydration', 'gender',
+              'headache', 'muscle_pain', 'fatigue', 'chills'],
+    'thyroid': ['age', 'TSH', 'T3', 'T4', 'TT4', 'T4U', 'FTI'],
+    'bp': ['age', 'weight', 'height', 'systolic', 'diastolic', 'cholesterol', 'pulse',
+           'gender'],
+}
+
+# Fields whose form widget takes whole numbers; everything else is a float
+INT_FIELDS = {'age', 'glucose', 'fasting', 'post_meal', 'duration', 'heart_rate'}
+
+# Glucose mmol/L -> mg/dL, and pounds -> kilograms
+MMOL_TO_MG_DL = 18.0182
+LB_TO_KG = 0.45359237
+
+# Units a CSV header or report may give for each field. The first is the one
+# the models were trained on; the others are converted (UNIT_CONVERSIONS).
+# A header with any other unit leaves its column unmatched.
+FIELD_UNITS = {
+    'age': ['years', 'yrs', 'yr'],
+    'bmi': ['kg/m2', 'kg/m²'],
+    'glucose': ['mg/dl', 'mmol/l'],
+    'fasting': ['mg/dl', 'mmol/l'],
+    'post_meal': ['mg/dl', 'mmol/l'],
+    'hba1c': ['%'],
+    'temp': ['°c', 'c', '°f', 'f'],
+    'duration': ['days', 'day'],
+    'heart_rate': ['bpm', '/min', 'beats/min'],
+    'pulse': ['bpm', '/min', 'beats/min'],
+    'weight': ['kg', 'lb', 'lbs'],
+    'height': ['cm', 'in', 'm'],
+    'systolic': ['mmhg'],
+    'diastolic': ['mmhg'],
+    'cholesterol': ['mg/dl'],
+    'TSH': ['miu/l', 'mu/l', 'uiu/ml', 'µiu/ml'],
+    'T3': ['nmol/l'],
+    'T4': ['nmol/l'],
+    'TT4': ['nmol/l'],
+}
+
+# Unit -> conversion to the model unit; works on numbers and Series alike
+UNIT_CONVERSIONS = {
+    'mmol/l': lambda v: v * MMOL_TO_MG_DL,
+    '°f': lambda v: (v - 32) * 5 / 9,
+    'f': lambda v: (v - 32) * 5 / 9,
+    'lb': lambda v: v * LB_TO_KG,
+    'lbs': lambda v: v * LB_TO_KG,
+    'in': lambda v: v * 2.54,
+    'm': lambda v: v * 100,
+}
+
+# Matched columns needed before a CSV is used to pre-fill the form
+MIN_MATCHED = {'diabetes': 5, 'fever': 5, 'thyroid': 4, 'bp': 5}
+
+# Categorical field -> pipeline mapping used to encode it. Fields mapped to
+# None are Yes/No symptoms the pages encode as ``value == 'Yes'``.
+CATEGORICAL = {
+    'gender': 'gender_mapping',
+    'family_history': 'family_history_mapping',
+    'severity': 'severity_mapping',
+    'dehydration': 'severity_mapping',
+    'headache': None,
+    'muscle_pain': None,
+    'fatigue': None,
+    'chills': None,
+}
+
+# Spellings seen in uploads for the categorical values the pipelines expect
+VALUE_ALIASES = {
+    'm': 'Male', 'f': 'Female',
+    'positive': 'Yes', 'negative': 'No',
+    'y': 'Yes', 'n': 'No', 'true': 'Yes', 'false': 'No',
+    '1': 'Yes', '0': 'No', '1.0': 'Yes', '0.0': 'No',
+}
+
+# pandas' default NA strings minus "None", which is a severity/dehydration level
+CSV_NA_VALUES = ['', '#N/A', '#N/A N/A', '#NA', '-1.#IND', '-1.#QNAN', '-NaN', '-nan',
+                 '1.#IND', '1.#QNAN', '<NA>', 'N/A', 'NA', 'NULL', 'NaN', 'n/a', 'nan', 'null']
+
+_resolver = HeaderResolver(COLUMN_MAPS, FIELD_UNITS)
+
+# Unit written in a report key, e.g. "Glucose (mmol/L)"
+_KEY_UNIT = re.compile(r"\(([^)]*)\)")
+
+
+def match_columns(name, columns):
+    """Map field keys to the CSV columns whose header matches an alias.
+
+    Exact alias matches come first; remaining headers are matched fuzzily
+    (``Fasting_Blod_Sugar``, ``Cholestrol (mg/dL)``). See ``utils.headers``.
+    """
+    return _resolver.resolve(name, columns)
+
+def missing_fields(name, matched):
+    """Fields that cannot be filled from the matched columns."""
+    fields = [key for key in FIELDS[name] if key not in matched]
+    if name == 'bp' and 'weight' in matched and 'height' in matched:
+        # The page derives BMI from weight and height
+        fields = [key for key in fields if key != 'bmi']
+    return fields
+
+
+def to_model_units(key, value, unit):
+    """``value`` of field ``key`` given in ``unit``, in the unit the models use."""
+    unit = unit.strip().lower()
+    if unit in FIELD_UNITS.get(key, ())[1:] and unit in UNIT_CONVERSIONS:
+        return UNIT_CONVERSIONS[unit](value)
+    return value
+
+
+def convert_value(key, value, unit=''):
+    """Turn a value read from a report into what the form widget expects."""
+    value = value.strip()
+    if key == 'gender':
+        return 'Male' if value[:1].upper() == 'M' else 'Female'
+    if key == 'family_history':
+        return 'Yes' if value.lower() in ['yes', 'positive'] else 'No'
+    if key in ('severity', 'dehydration'):
+        return value.capitalize()
+    if key in CATEGORICAL and CATEGORICAL[key] is None:
+        return 'Yes' if value.lower() == 'yes' else 'No'
+
+    number = to_model_units(key, float(value), unit)
+    return int(round(number)) if key in INT_FIELDS else number
+
+
+def column_value(key, df, column, row=0):
+    """Form value of field ``key`` from ``df[column]``, converted from the header's unit."""
+    value = df[column].iloc[row]
+    unit = header_unit(column)
+    if key in CATEGORICAL or not unit:
+        return value
+    try:
+        return convert_value(key, str(value), unit)
+    except ValueError:
+        return value
+
+
+def report_fields(name=None):
+    """Report fields of predictor ``name``, or of all predictors if None."""
+    if name is not None:
+        return REPORT_FIELDS[name]
+    return list(dict.fromkeys(key for fields in REPORT_FIELDS.values() for key in fields))
+
+
+def _report_keys(name, keys):
+    fields = report_fields(name)
+    if keys is not None:
+        fields = [key for key in fields if key in keys]
+    return fields
+
+
+def parse_fields(name, text, keys=None):
+    """Field values found in report text, keyed like the form fields.
+
+    The text is scanned once for all fields of predictor ``name`` (all
+    predictors if None). ``keys`` limits the search to those fields, e.g.
+    the ones still missing after earlier pages of a report.
+    """
+    extracted = {}
+    for key, match in extractor.extract(text, _report_keys(name, keys)).items():
+        try:
+            extracted[key] = convert_value(key, match.value, match.unit)
+        except ValueError:
+            continue
+    return extracted
+
+
+def parse_pair(name, key, value, keys=None):
+    """Field value from a report key/value pair, e.g. a two-column table row.
+
+    The key is normalised like a CSV header, so "Post-Meal Sugar (mmol/L)"
+    finds ``post_meal``; a unit written in the key applies to the value.
+    """
+    unit = _KEY_UNIT.search(key)
+    match = extractor.match_pair(normalize_header(key), value, _report_keys(name, keys))
+    if match is None:
+        return {}
+    try:
+        return {match.field: convert_value(match.field, match.value,
+                                           match.unit or (unit.group(1) if unit else ''))}
+    except ValueError:
+        return {}
+
+
+def _category_lookup(mapping):
+    lookup = {str(label).lower(): code for label, code in mapping.items()}
+    for alias, label in VALUE_ALIASES.items():
+        if label in mapping:
+            lookup.setdefault(alias, mapping[label])
+    return lookup
+
+
+def read_csv(source, **kwargs):
+    """``pd.read_csv`` that keeps a literal "None" but reads empty cells as NaN."""
+    import pandas as pd
+
+    return pd.read_csv(source, keep_default_na=False, na_values=CSV_NA_VALUES, **kwargs)
+
+
+def encode_frame(name, pipeline, df, matched):
+    """Encode every row of ``df`` into the pipeline's feature matrix.
+
+    Works column by column: numeric columns are coerced with
+    ``pd.to_numeric`` and converted from the unit in their header, and
+    categorical ones are mapped through the pipeline's ``*_mapping`` dicts.
+    Values that cannot be encoded, including empty cells, become NaN; read
+    CSVs with ``read_csv`` so a "None" level is not one of them.
+    """
+    import pandas as pd
+
+    def numeric(key):
+        values = pd.to_numeric(df[matched[key]], errors='coerce')
+        return to_model_units(key, values, header_unit(matched[key]))
+
+    columns = []
+    for key in FIELDS[name]:
+        if key == 'bmi' and name == 'bp' and key not in matched:
+            column = numeric('weight') / ((numeric('height') / 100) ** 2)
+        elif key in CATEGORICAL:
+            mapping_key = CATEGORICAL[key]
+            mapping = pipeline[mapping_key] if mapping_key else {'Yes': 1, 'No': 0}
+            normalized = df[matched[key]].astype(str).str.strip().str.lower()
+            column = normalized.map(_category_lookup(mapping))
+        else:
+            column = numeric(key)
+        columns.append(np.asarray(column, dtype=np.float64))
+    return np.column_stack(columns)
+
+
+def _number(value):
+    # float() also takes True, NaN and "inf", none of which is a reading
+    if isinstance(value, bool):
+        raise TypeError(value)
+    number = float(value)
+    if not math.isfinite(number):
+        raise ValueError(value)
+    return number
+
+
+def encode_rows(name, pipeline, rows):
+    """Encode JSON-style rows (dicts) into the pipeline's feature matrix.
+
+    Keys may be field keys (``hba1c``) or the pipeline's ``feature_names``
+    (``HbA1c (%)``). Categorical values go through the same mappings as
+    ``encode_frame``; for ``bp`` a missing BMI is derived from weight and
+    height. Every other field is required; a "None" severity is the string,
+    not null. Raises ValueError naming the first row and field that is
+    missing or cannot be encoded, including NaN, infinite and boolean numbers.
+    """
+    keys = FIELDS[name]
+    aliases = dict(zip(pipeline['feature_names'], keys))
+    lookups = {}
+    for key in keys:
+        if key in CATEGORICAL:
+            mapping_key = CATEGORICAL[key]
+            lookups[key] = _category_lookup(pipeline[mapping_key] if mapping_key
+                                            else {'Yes': 1, 'No': 0})
+
+    X = np.empty((len(rows), len(keys)), dtype=np.float64)
+    for r, row in enumerate(rows):
+        if not isinstance(row, dict):
+            raise ValueError(f"row {r}: expected an object of field values")
+        values = {aliases.get(key, key): value for key, value in row.items()}
+        for c, key in enumerate(keys):
+            value = values.get(key)
+            if value is None and not (key == 'bmi' and name == 'bp'):
+                raise ValueError(f"row {r}: '{key}' is required")
+            if key in lookups:
+                code = lookups[key].get(str(value).strip().lower())
+                if code is None:
+                    choices = pipeline[CATEGORICAL[key]] if CATEGORICAL[key] else ['Yes', 'No']
+                    raise ValueError(f"row {r}: '{key}' must be one of "
+                                     f"{', '.join(map(str, choices))}")
+                X[r, c] = code
+                continue
+            try:
+                if value is None and key == 'bmi' and name == 'bp':
+                    value = _number(values['weight']) / ((_number(values['height']) / 100) ** 2)
+                X[r, c] = _number(value)
+            except (KeyError, TypeError, ValueError, ZeroDivisionError):
+                raise ValueError(f"row {r}: '{key}' must be a number") from None
+    return X
+
+
+def score_frame(name, pipeline, df, matched):
+    """Copy of ``df`` with ``Prediction`` and ``Confidence`` columns added.
+
+    All rows are encoded and scored in one vectorized call. Rows with a
+    missing or unreadable value are left without a prediction.
+    """
+    X = encode_frame(name, pipeline, df, matched)
+    complete = ~np.isnan(X).any(axis=1)
+    labels = np.full(len(df), None, dtype=object)
+    confidence = np.full(len(df), np.nan)
+    if complete.any():
+        predicted, proba = pipeline.classify(X[complete])
+        labels[complete] = predicted
+        confidence[complete] = proba.max(axis=1)
+
+    results = df.copy()
+    results['Prediction'] = labels
+    results['Confidence'] = confidence.round(4)
+    return results
@@ -0,0 +1,138 @@
+"""Image clean-up in front of OCR.
+
+Phone photos of reports arrive at 12+ megapixels, often rotated by EXIF
+metadata only, in colour and with uneven lighting. tesseract's run time
+grows with the pixel count and its own global binarisation copes badly with
+shadows, so each image is prepared first:
+
+1. EXIF orientation applied (``ImageOps.exif_transpose``)
+2. grayscale (ITU-R 601 luma) as a uint8 array
+3. downscaled with a box filter to about ``TARGET_DPI``
+4. adaptive (Bradley-Roth local mean) binarisation
+5. optional deskew by projection-profile search
+
+Everything after step 1 works on NumPy arrays.
+"""
+import os
+
+import numpy as np
+from PIL import Image, ImageOps
+
+TARGET_DPI = int(os.environ.get('NEO_OCR_DPI', 300))
+
+# Long side of a letter/A4 page in inches, used when an image has no DPI
+PAGE_INCHES = 11.0
+
+# Pixel is ink if darker than this fraction of its neighbourhood mean
+BINARIZE_RATIO = 0.85
+
+# Deskew search range and step, in degrees
+DESKEW_MAX_ANGLE = 5.0
+DESKEW_STEP = 0.25
+
+# Images are only resized when that removes more than this share of pixels
+MIN_DOWNSCALE = 0.9
+
+
+
+def to_grayscale(image):
+    """uint8 luma array of a PIL image."""
+    if image.mode != 'L':
+        # PIL's "L" conversion uses the ITU-R 601 weights
+        image = image.convert('L')
+    return np.asarray(image)
+
+
+def source_dpi(image, shape):
+    """DPI of a page photo or scan.
+
+    Stored DPI is only trusted when it makes the long side a plausible page
+    length; cameras write 72 or 96 whatever they photographed. Otherwise
+    the long side is assumed to span ``PAGE_INCHES``.
+    """
+    dpi = image.info.get('dpi')
+    if dpi and dpi[0] and 5 <= max(shape) / float(dpi[0]) <= 17:
+        return float(dpi[0])
+    return max(shape) / PAGE_INCHES
+
+
+def downscale(gray, scale):
+    """Resize a uint8 array by ``scale`` (< 1) with a box filter."""
+    if scale >= MIN_DOWNSCALE:
+        return gray
+    h, w = gray.shape
+    size = (max(1, round(w * scale)), max(1, round(h * scale)))
+    return np.asarray(Image.fromarray(gray).resize(size, Image.BOX))
+
+
+def binarize(gray, window=None, ratio=BINARIZE_RATIO):
+    """Adaptive threshold against the local mean (Bradley-Roth).
+
+    The local sums over a ``window`` square come from running sums of the
+    edge-padded array, one axis at a time, so the cost does not depend on
+    the window size. Sums are int32, exact for uint8 input. Returns a uint8
+    array with text black (0) on white (255).
+    """
+    h, w = gray.shape
+    window = window or max(15, (min(h, w) // 40) | 1)
+    half = window // 2
+
+    padded = np.pad(gray, half + 1, mode='edge').astype(np.int32)
+    running = np.cumsum(padded, axis=0)
+    vertical = running[window:window + h] - running[:h]
+    running = np.cumsum(vertical, axis=1)
+    window_sum = running[:, window:window + w] - running[:, :w]
+
+    paper = gray * np.float32(window * window) >= window_sum * np.float32(ratio)
+    return paper.astype(np.uint8) * 255
+
+
+def estimate_skew(binary, max_angle=DESKEW_MAX_ANGLE, step=DESKEW_STEP):
+    """Counter-clockwise rotation in degrees that levels the text lines.
+
+    Ink pixels are projected onto rows for each candidate angle; lines are
+    level where the row histogram is sharpest (largest variance).
+    """
+    ys, xs = np.nonzero(binary == 0)
+    if ys.size < 100:
+        return 0.0
+    if ys.size > 200_000:
+        pick = np.random.default_rng(0).choice(ys.size, 200_000, replace=False)
+        ys, xs = ys[pick], xs[pick]
+
+    best_angle, best_score = 0.0, -1.0
+    for angle in np.arange(-max_angle, max_angle + step / 2, step):
+        theta = np.deg2rad(angle)
+        projected = np.round(ys * np.cos(theta) - xs * np.sin(theta)).astype(np.int64)
+        histogram = np.bincount(projected - projected.min())
+        score = float(histogram.var())
+        if score > best_score:
+            best_angle, best_score = float(angle), score
+    return best_angle
+
+
+def preprocess_image(image, target_dpi=TARGET_DPI, deskew=False):
+    """OCR-ready binarised copy of a PIL image and its effective DPI."""
+    dpi = source_dpi(image, image.size)
+    scale = min(1.0, target_dpi / dpi)
+    if scale < MIN_DOWNSCALE and image.format == 'JPEG':
+        # Let libjpeg decode straight to grayscale at 1/2, 1/4 or 1/8 size
+        # (never below the requested size) instead of decoding every pixel
+        width, height = image.size
+        image.draft('L', (int(width * scale), int(height * scale)))
+        scale *= width / image.size[0]
+        dpi *= image.size[0] / width
+
+    image = ImageOps.exif_transpose(image)
+    gray = to_grayscale(image)
+    if scale < MIN_DOWNSCALE:
+        gray = downscale(gray, scale)
+        dpi *= scale
+    binary = binarize(gray)
+
+    result = Image.fromarray(binary)
+    if deskew:
+        angle = estimate_skew(binary)
+        if angle:
+            result = result.rotate(angle, resample=Image.BILINEAR, expand=True, fillcolor=255)
+    return result, int(round(dpi))
@@ -0,0 +1,217 @@
+"""One uploaded report shared by every predictor page of a session.
+
+A lab PDF usually carries the glucose, thyroid, blood pressure and vitals
+panels together. The first PDF or image upload on any page is parsed once
+for the fields of all four predictors. The values go into
+``st.session_state``, which every page already reads its form defaults from,
+so the other pages pre-fill without re-uploading or re-running OCR. A long
+PDF is not read to the end for fields it may not have: reading stops once
+the uploading page's own fields are found and later pages add no others.
+
+PDFs and images that are not cached yet are read in the background on the
+server-wide queue (``utils.ocr_queue``) rather than in the page script. The
+job belongs to the session, not the page: while it waits or runs, every
+predictor page shows its queue position or per-page progress with a cancel
+button and the form stays usable. Whichever page is open when the job
+finishes merges its fields into the session and reruns.
+
+The ingest and OCR modules (PyPDF2, python-docx, PIL, pytesseract) are
+imported on the first upload, not when a page starts.
+"""
+import time
+
+import streamlit as st
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+from utils.extraction_cache import extraction_cache
+from utils.predictors import report_fields
+
+SESSION_KEY = 'shared_report'
+JOB_KEY = 'shared_report_job'
+SHOWN_KEY = 'shared_report_job_shown'
+
+# Seconds between checks on a queued job, and before retrying a full queue
+POLL_SECONDS = 1.0
+RETRY_SECONDS = 5.0
+
+
+def _session_id():
+    ctx = get_script_run_ctx()
+    return ctx.session_id if ctx else 'local'
+
+
+def _run_marker():
+    """Object that is the same throughout one script run and new in the next.
+
+    Streamlit has no public per-run id, and a token in ``st.session_state``
+    outlives the run. This relies on an internal: ``ScriptRunContext``
+    replaces its ``cursors`` dict at the start of every run (checked on
+    1.37, the pinned minimum, through 1.65).
+    """
+    ctx = get_script_run_ctx()
+    return ctx.cursors if ctx else None
+
+
+def _mark_shown(job):
+    """Note that this script run already shows ``job``."""
+    st.session_state[SHOWN_KEY] = (job.id, _run_marker())
+
+
+def _shown_this_run(job):
+    shown = st.session_state.get(SHOWN_KEY)
+    return shown is not None and shown[0] == job.id and shown[1] is _run_marker()
+
+
+def _share(file_name, extraction):
+    st.session_state[SESSION_KEY] = {
+        'file_name': file_name,
+        'fields': extraction.fields,
+        'stats': extraction.stats,
+    }
+    st.session_state.update(extraction.fields)
+
+
+@st.fragment(run_every=POLL_SECONDS)
+def _watch_job(job, file_name):
+    from utils.ocr_queue import ocr_queue
+
+    if job.done():
+        st.rerun()
+    if job.status == 'running':
+        stage, done, total = job.progress or ("Reading report", 0, 1)
+        st.progress(done / max(total, 1), text=f"🔎 {file_name}: {stage} ({done}/{total})")
+    else:
+        position = ocr_queue.position(job)
+        st.info(f"⏳ {file_name}: waiting for OCR, {position} "
+                f"report{'s' if position != 1 else ''} ahead")
+    if job.cancel_requested:
+        st.caption("Cancelling...")
+    elif st.button("✖ Cancel", key=f"cancel_report_job_{job.id}"):
+        ocr_queue.cancel(job)
+        st.rerun()
+
+
+@st.fragment(run_every=POLL_SECONDS)
+def _retry_later(retry_at, reason):
+    if time.monotonic() >= retry_at:
+        st.rerun()
+    st.warning(f"⏳ OCR is busy ({reason}), retrying in "
+               f"{max(0, retry_at - time.monotonic()):.0f}s")
+
+
+def _render_cancelled(file_name, job):
+    st.caption(f"Reading {file_name} was cancelled")
+    if st.button("🔄 Read again", key=f"retry_report_job_{job.id}"):
+        del st.session_state[JOB_KEY]
+        st.rerun()
+
+
+def _queued_extraction(uploaded_file, data, name):
+    """Extraction of a queued upload once its job finished, else None."""
+    from utils.ingest import extract_report_fields
+    from utils.ocr_queue import QueueFull, ocr_queue
+
+    digest = extraction_cache.key(data)
+    pending = st.session_state.get(JOB_KEY)
+    if pending and pending['digest'] != digest:
+        # A different report was uploaded; its predecessor is not needed
+        if pending['job'] is not None:
+            ocr_queue.cancel(pending['job'])
+        pending = None
+
+    if pending is None or pending['job'] is None:
+        if pending and time.monotonic() < pending['retry_at']:
+            _retry_later(pending['retry_at'], pending['reason'])
+            return None
+        try:
+            job = ocr_queue.submit(_session_id(), extract_report_fields, data,
+                                   uploaded_file.type, priority=name,
+                                   cpu_budget=ocr_queue.cpu_budget)
+        except QueueFull as e:
+            retry_at = time.monotonic() + RETRY_SECONDS
+            st.session_state[JOB_KEY] = {'digest': digest, 'job': None,
+                                         'file_name': uploaded_file.name,
+                                         'retry_at': retry_at, 'reason': str(e)}
+            _retry_later(retry_at, str(e))
+            return None
+        pending = st.session_state[JOB_KEY] = {'digest': digest, 'job': job,
+                                               'file_name': uploaded_file.name}
+
+    job = pending['job']
+    if job.status == 'cancelled':
+        # Kept so reruns with the same upload do not start it again
+        _mark_shown(job)
+        _render_cancelled(uploaded_file.name, job)
+        return None
+    if not job.done():
+        _mark_shown(job)
+        _watch_job(job, uploaded_file.name)
+        return None
+    del st.session_state[JOB_KEY]
+    if job.status == 'failed':
+        raise job.error
+    return job.result
+
+
+def load_shared_report(uploaded_file, name):
+    """Parse a PDF/image upload for every predictor and share the result.
+
+    Returns the fields of predictor ``name`` so the calling page can report
+    what it found, or None while the upload is still being read.
+    """
+    from utils.ingest import DOCX_MIME, cached_report_fields, extract_report_fields
+
+    data = uploaded_file.getvalue()
+    if uploaded_file.type == DOCX_MIME:
+        extraction = extract_report_fields(data, uploaded_file.type, priority=name)
+    else:
+        extraction = cached_report_fields(data, priority=name)
+        if extraction is None:
+            extraction = _queued_extraction(uploaded_file, data, name)
+            if extraction is None:
+                return None
+        else:
+            st.session_state.pop(JOB_KEY, None)
+
+    _share(uploaded_file.name, extraction)
+    stats = extraction.stats
+    if stats['pages_skipped']:
+        st.caption(f"Stopped reading after {stats['pages_read']} of "
+                   f"{stats['pages_total']} pages")
+    return {key: value for key, value in extraction.fields.items()
+            if key in report_fields(name)}
+
+
+def _collect_background_job():
+    """Progress of a report job started on another page; shares it once done."""
+    pending = st.session_state.get(JOB_KEY)
+    if not pending or pending['job'] is None:
+        return
+    job = pending['job']
+    if _shown_this_run(job) or job.status == 'cancelled':
+        # Shown by the upload on this page, or kept for its "Read again"
+        return
+    if not job.done():
+        _watch_job(job, pending['file_name'])
+        return
+    del st.session_state[JOB_KEY]
+    if job.status == 'done':
+        _share(pending['file_name'], job.result)
+    elif job.status == 'failed':
+        st.error(f"Error processing file: {job.error}")
+
+
+def render_shared_report_notice(name):
+    """Note on a page that its form was pre-filled from another page's upload.
+
+    Also shows, and on completion applies, a report still being read for
+    this session on another page.
+    """
+    _collect_background_job()
+    report = st.session_state.get(SESSION_KEY)
+    if not report:
+        return
+    fields = [key for key in report_fields(name) if key in report['fields']]
+    if fields:
+        st.info(f"📄 {len(fields)} of {len(report_fields(name))} fields pre-filled "
+                f"from {report['file_name']}")
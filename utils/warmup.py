@@ -0,0 +1,135 @@
+"""Load and exercise every predictor pipeline before the first user does.
+
+The first prediction on a fresh process pays for loading the artifact
+(unpickling and compiling a ``.pkl``, or mapping a flat artifact) and for
+first-call overhead in NumPy. ``warm_up`` loads each pipeline through the
+shared registry, scores a synthetic row (the training means from the
+scaler) and a small batch to prime those paths, then times single-row
+scoring. ``readiness`` reports, per predictor, whether it is loaded, its
+version, the load and warm-up times and the measured latency.
+
+The scoring service warms up before it starts listening. Streamlit has no
+server-start hook, so ``app.py`` and the pages call ``start_warmup``, which
+runs once per process in a background thread on the first script run.
+``NEO_WARMUP=0`` turns that off. ``python -m utils.warmup`` warms up in its
+own process and prints the report, e.g. as a deploy check.
+"""
+import os
+import statistics
+import threading
+import time
+
+import numpy as np
+
+from utils.model_registry import ARTIFACTS, registry
+
+WARMUP_ENABLED = os.environ.get('NEO_WARMUP', '1') != '0'
+
+# Single-row scoring calls timed per predictor
+LATENCY_SAMPLES = int(os.environ.get('NEO_WARMUP_SAMPLES', 20))
+
+_status = {}
+_lock = threading.Lock()
+_thread = None
+
+
+def synthetic_rows(pipeline, count=1):
+    """``count`` copies of a plausible encoded row: the training feature means."""
+    row = np.asarray(pipeline['scaler'].mean_, dtype=np.float64)
+    return np.repeat(row.reshape(1, -1), count, axis=0)
+
+
+def warm_up_pipeline(name, samples=LATENCY_SAMPLES):
+    """Load and prime predictor ``name``; returns and records its status.
+
+    Scoring goes through ``classify``, which skips the prediction cache, so
+    the synthetic rows neither fill it nor count as hits.
+    """
+    start = time.perf_counter()
+    try:
+        pipeline = registry.get(name)
+        primed = time.perf_counter()
+        pipeline.classify(synthetic_rows(pipeline))
+        pipeline.classify(synthetic_rows(pipeline, 8))
+        warmed = time.perf_counter()
+
+        row = synthetic_rows(pipeline)
+        timings = []
+        for _ in range(max(1, samples)):
+            call = time.perf_counter()
+            pipeline.classify(row)
+            timings.append(time.perf_counter() - call)
+        info = registry.info(name)
+        status = {
+            'ready': True,
+            'version': pipeline.version,
+            'load_seconds': round(info['load_seconds'], 4),
+            'first_get_seconds': round(primed - start, 4),
+            'warmup_seconds': round(warmed - primed, 4),
+            'latency_ms': round(statistics.median(timings) * 1e3, 3),
+            'error': None,
+        }
+    except Exception as e:
+        status = {'ready': False, 'error': f"{type(e).__name__}: {e}"}
+    status['checked_at'] = time.time()
+    with _lock:
+        _status[name] = status
+    return status
+
+
+def warm_up(names=None):
+    """Warm up ``names`` (default: every predictor) in turn; returns ``readiness()``."""
+    for name in names or ARTIFACTS:
+        warm_up_pipeline(name)
+    return readiness()
+
+
+def start_warmup():
+    """Warm every predictor in a background thread, once per process."""
+    global _thread
+    if not WARMUP_ENABLED:
+        return
+    with _lock:
+        if _thread is not None:
+            return
+        _thread = threading.Thread(target=warm_up, daemon=True, name='model-warmup')
+    _thread.start()
+
+
+def readiness():
+    """Readiness report: overall flag plus the status of every predictor.
+
+    ``version`` is what the registry holds now; it differs from
+    ``warmed_version`` after a model file was replaced and reloaded.
+    """
+    with _lock:
+        statuses = {name: dict(_status.get(name) or {'ready': False, 'error': None})
+                    for name in ARTIFACTS}
+        warming = _thread is not None and _thread.is_alive()
+    for name, status in statuses.items():
+        info = registry.info(name)
+        status['warmed_version'] = status.pop('version', None)
+        status['version'] = info['version'] if info else None
+    return {
+        'ready': all(status['ready'] for status in statuses.values()),
+        'warming': warming,
+        'pipelines': statuses,
+    }
+
+
+def main():
+    start = time.perf_counter()
+    report = warm_up()
+    for name, status in report['pipelines'].items():
+        if status['ready']:
+            print(f"✅ {name:9s} v{status['version']} load {status['load_seconds'] * 1e3:7.1f} ms | "
+                  f"warm-up {status['warmup_seconds'] * 1e3:6.1f} ms | "
+                  f"single row {status['latency_ms']:6.3f} ms")
+        else:
+            print(f"❌ {name:9s} {status['error']}")
+    print(f"{'🟢' if report['ready'] else '🔴'} Warm-up finished in "
+          f"{time.perf_counter() - start:.2f}s")
+
+
+if __name__ == '__main__':
+    main()